@@ -0,0 +1,55 @@
+"""API authentication classes."""
+
+import hashlib
+
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+from .settings import settings
+
+TOKEN_CACHE_KEY = 'api:token:{}'
+
+
+def _get_key(key: str) -> str:
+    # Tokens are secrets, do not expose them in cache keys
+    return TOKEN_CACHE_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def get_token_cache():
+    """Return the cache of authentication tokens, or None if disabled."""
+    alias = settings.API_TOKEN_CACHE
+    return None if alias is None else caches[alias]
+
+
+def invalidate_tokens(*keys: str):
+    """Remove tokens from the authentication cache."""
+    cache = get_token_cache()
+    if cache is not None:
+        cache.delete_many([_get_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication caching the user of each token.
+
+    Saves the token and user query on each request. Tokens are cached in
+    the `API_TOKEN_CACHE` cache, which must be shared by all processes;
+    without it, this behaves as `TokenAuthentication`. Cached tokens
+    expire after `API_TOKEN_CACHE_TIMEOUT` seconds, and are invalidated
+    when the token is deleted or its user saved (e.g. after a password
+    or `is_active` change), see `api.signals`.
+
+    Note: queryset `.update()` calls do not send signals, hence must be
+    followed by a call to `invalidate_tokens()`.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        if cache is None:
+            return super().authenticate_credentials(key)
+        cache_key = _get_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            cache.set(cache_key, credentials,
+                      settings.API_TOKEN_CACHE_TIMEOUT)
+        return credentials
@@ -0,0 +1,33 @@
+"""API app system checks."""
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Cache backends whose entries are not shared between processes.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register()
+def check_token_cache_is_shared(app_configs, **kwargs):
+    errors = []
+
+    alias = getattr(settings, 'API_TOKEN_CACHE', None)
+    if alias is None:
+        return errors
+
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend in PER_PROCESS_CACHES:
+        errors.append(
+            Warning(
+                f'API_TOKEN_CACHE uses the per-process {backend} backend: '
+                'deleted tokens keep authenticating requests in other '
+                'processes until they expire',
+                hint='Use a shared cache backend, e.g. Memcached.',
+                obj=settings,
+                id='api.W001',
+            )
+        )
+
+    return errors
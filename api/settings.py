@@ -0,0 +1,13 @@
+"""API settings."""
+
+from django.conf import settings
+from utils import setdefault
+
+
+# Alias of the cache (see CACHES) where authentication tokens are cached.
+# It must be shared by all processes (e.g. Memcached or Redis) so that
+# deleted tokens are rejected by every process. Disabled by default.
+setdefault(settings, 'API_TOKEN_CACHE', None)
+# Seconds during which authentication tokens are cached
+# (they are also invalidated when the token or its user change)
+setdefault(settings, 'API_TOKEN_CACHE_TIMEOUT', 300)
@@ -0,0 +1,27 @@
+"""API signals."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.models import User
+
+from .authentication import get_token_cache, invalidate_tokens
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance: Token, **kwargs):
+    """Stop authenticating with a token as soon as it is deleted."""
+    invalidate_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance: User, **kwargs):
+    """Refresh the cached user of tokens when the user changes.
+
+    This covers password and `is_active` changes.
+    """
+    if get_token_cache() is None:
+        return
+    keys = Token.objects.filter(user=instance).values_list('key', flat=True)
+    invalidate_tokens(*keys)
@@ -1,6 +1,8 @@
 """Core admin panel configuration."""
 
 from django.contrib import admin
+
+from .exports import csv_response, iter_rows, model_columns, xlsx_response
 from .models import Document, Address
 # Register your models here.
 
@@ -40,3 +42,47 @@ class AutocompleteAddressMixin:
         initial = getattr(self, 'autocomplete_fields', ())
         if self.address_field_name not in initial:
             self.autocomplete_fields = initial + (self.address_field_name,)
+
+
+class ExportMixin:
+    """Add CSV and XLSX export actions to a model admin.
+
+    The exported rows are fetched in a single query and streamed.
+    Add `export_as_csv` and/or `export_as_xlsx` to the admin's actions.
+
+    Class Attributes
+    ----------------
+    export_columns : sequence, optional
+        Column specs of the export (see `core.exports.compile_column()`).
+        Defaults to the model's concrete fields.
+    """
+
+    export_columns = None
+
+    def get_export_columns(self, request):
+        """Return the column specs of the export."""
+        if self.export_columns is None:
+            return model_columns(self.model)
+        return self.export_columns
+
+    def get_export_filename(self, request, extension: str) -> str:
+        """Return the name of the exported file."""
+        return f'{self.model._meta}.{extension}'
+
+    def get_export_rows(self, request, queryset):
+        """Return an iterator over the exported rows."""
+        return iter_rows(queryset, self.get_export_columns(request))
+
+    def export_as_csv(self, request, queryset):
+        filename = self.get_export_filename(request, 'csv')
+        return csv_response(self.get_export_rows(request, queryset),
+                            filename=filename)
+
+    export_as_csv.short_description = "Exporter sélection (en .csv)"
+
+    def export_as_xlsx(self, request, queryset):
+        filename = self.get_export_filename(request, 'xlsx')
+        return xlsx_response(self.get_export_rows(request, queryset),
+                             filename=filename)
+
+    export_as_xlsx.short_description = "Exporter sélection (en .xlsx)"
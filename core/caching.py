@@ -0,0 +1,88 @@
+"""Caching of serialized representations."""
+
+import hashlib
+from collections import OrderedDict
+
+from django.core.cache import cache
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+from .fields import get_markdown_format
+from .settings import settings
+from .versions import get_versions, track_versions
+
+REPRESENTATION_KEY = 'core:representation:{}:{}:{}'
+
+
+class CachedRepresentationMixin:
+    """Cache the representation of objects by a serializer.
+
+    Representations are cached by object and by version of the models
+    they contain: saving or deleting an instance of one of these models
+    invalidates them once the transaction commits. As versions are stored
+    in the database, this holds even with a per-process cache.
+
+    Class attributes
+    ----------------
+    cache_version_models : tuple
+        Models whose instances appear in the representation. Their
+        version stamps are tracked when the serializer class is created.
+        Frequently saved models (e.g. users) defeat the cache.
+    uncached_fields : tuple
+        Names of fields computed on each call, e.g. because they depend
+        on the current user or change too often to be tracked.
+    """
+
+    cache_version_models = ()
+    uncached_fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        track_versions(*cls.cache_version_models)
+
+    def get_cache_key(self, instance) -> str:
+        """Return the cache key of the representation of an object.
+
+        Absolute URLs appear in representations, hence the key
+        depends on the requested host. It also depends on the requested
+        format of Markdown fields.
+        """
+        request = self.context.get('request')
+        parts = [request.build_absolute_uri('/') if request else '',
+                 get_markdown_format(request)]
+        parts += sorted(get_versions(self.cache_version_models).values())
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        name = f'{type(self).__module__}.{type(self).__qualname__}'
+        return REPRESENTATION_KEY.format(name, instance.pk, digest)
+
+    def to_representation(self, instance):
+        key = self.get_cache_key(instance)
+        cached = cache.get(key)
+        if cached is None:
+            data = super().to_representation(instance)
+            cached = OrderedDict(
+                (name, value) for name, value in data.items()
+                if name not in self.uncached_fields)
+            cache.set(key, cached,
+                      settings.CORE_REPRESENTATION_CACHE_TIMEOUT)
+            return data
+
+        data = OrderedDict()
+        for field in self._readable_fields:
+            name = field.field_name
+            if name not in self.uncached_fields:
+                if name in cached:
+                    data[name] = cached[name]
+                continue
+            # Same as Serializer.to_representation()
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+            if isinstance(attribute, PKOnlyObject):
+                is_none = attribute.pk is None
+            else:
+                is_none = attribute is None
+            data[name] = (None if is_none
+                          else field.to_representation(attribute))
+        return data
@@ -0,0 +1,69 @@
+"""Conditional GET support for read-mostly API endpoints.
+
+Views derive their ETag from the version stamps of the models they
+depend on (see `core.versions`), so that a matching `If-None-Match`
+header can be answered with a `304 Not Modified` response without
+querying nor serializing anything.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .versions import get_versions, track_versions
+
+
+class ConditionalGetMixin:
+    """Answer conditional GET requests on list and retrieve actions.
+
+    Class attributes
+    ----------------
+    version_models : tuple
+        Models whose instances appear in the responses. Their version
+        stamps are tracked when the view class is created.
+    etag_vary_on_user : bool
+        Whether the responses depend on the current user.
+        Defaults to False.
+    """
+
+    version_models = ()
+    etag_vary_on_user = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        track_versions(*cls.version_models)
+
+    def get_etag(self, request) -> str:
+        """Return the ETag of the response to a request.
+
+        It is computed from the version stamps, the requested URL
+        (which includes the query parameters and the host, which appears
+        in absolute links) and the accepted media types.
+        """
+        versions = get_versions(self.version_models)
+        parts = [request.build_absolute_uri(),
+                 request.META.get('HTTP_ACCEPT', '')]
+        if self.etag_vary_on_user:
+            parts.append(str(request.user.pk))
+        parts += sorted(versions.values())
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'"{digest}"'
+
+    def get_conditional_response(self, request, handler, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        # A 304 response must carry the validator of the 200 response.
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,320 @@
+"""Streaming CSV and XLSX exports.
+
+Exports are described by columns, each reading one or more field paths
+(which may span relations, e.g. `user__student__school`). All the paths
+of an export are fetched with a single `values_list()` query, iterated
+by chunks, and the file is streamed as rows are produced. Relations
+exported as text (see `RelatedColumn`) cost an extra query per chunk.
+
+Example
+-------
+columns = (
+    Column('user__email', header='email'),
+    'submitted',
+    Column('user__first_name', 'user__last_name', header='name',
+           transform=lambda first, last: f'{first} {last}'),
+)
+return csv_response(iter_rows(queryset, columns), filename='export.csv')
+"""
+
+import codecs
+import csv
+import datetime
+import itertools
+import re
+from decimal import Decimal
+from io import StringIO
+from typing import Callable, Iterable, Iterator, List, Sequence, Union
+from xml.sax.saxutils import escape
+
+from django.db.models import Model, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .file_utils import iter_zip
+
+CHUNK_SIZE = 500
+
+
+class Column:
+    """A column of an export.
+
+    Parameters
+    ----------
+    *paths : str
+        Field paths read by the column, using the `__` lookup syntax.
+    header : str, optional
+        Defaults to the first path.
+    transform : callable, optional
+        Receives the value of each path and returns the cell value.
+        By default, the value of the (single) path is used.
+    """
+
+    def __init__(self, *paths: str, header: str = None,
+                 transform: Callable = None):
+        if not paths:
+            raise TypeError('Column expects at least one field path')
+        if transform is None and len(paths) > 1:
+            raise TypeError('Columns with several paths need a transform')
+        self.paths = paths
+        self.header = header or paths[0]
+        self.transform = transform
+
+    def __repr__(self):
+        return f'<Column: {self.header}>'
+
+    def get_value(self, values: dict):
+        """Return the cell value from a mapping of path values."""
+        args = [values[path] for path in self.paths]
+        if self.transform is None:
+            return args[0]
+        return self.transform(*args)
+
+
+class RelatedColumn(Column):
+    """A column exporting the string representation of related objects.
+
+    The column reads the related object's primary key. Related objects
+    are fetched by `iter_rows()` with a query per chunk of rows.
+
+    Parameters
+    ----------
+    path : str
+        Path of the relation.
+    model : Model class
+        The related model.
+    header : str, optional
+    """
+
+    def __init__(self, path: str, model: Model, header: str = None):
+        super().__init__(path, header=header)
+        self.model = model
+
+    def fetch(self, chunk: List[dict]) -> dict:
+        """Return the representation of the objects related to rows.
+
+        Returns
+        -------
+        representations : dict
+            String representations, keyed by primary key.
+        """
+        pks = {values[self.paths[0]] for values in chunk} - {None}
+        if not pks:
+            return {}
+        objects = self.model._default_manager.in_bulk(pks)
+        return {pk: str(obj) for pk, obj in objects.items()}
+
+
+ColumnSpec = Union[Column, str, Sequence[str]]
+
+
+def compile_column(spec: ColumnSpec) -> Column:
+    """Build a column from a spec.
+
+    A spec is either a column, a path, or a (path, header) pair.
+    """
+    if isinstance(spec, Column):
+        return spec
+    if isinstance(spec, str):
+        return Column(spec)
+    path, header = spec
+    return Column(path, header=header)
+
+
+def model_columns(model: Model, **overrides) -> List[Column]:
+    """Return a column for each concrete field of a model.
+
+    Relations are exported as the string representation of the related
+    object (see `RelatedColumn`).
+
+    Parameters
+    ----------
+    model : Model class
+    **overrides :
+        Specs replacing the column of a field, by field name.
+        Pass None to leave a field out.
+    """
+    columns = []
+    for field in model._meta.concrete_fields:
+        if field.name in overrides:
+            spec = overrides[field.name]
+        elif field.is_relation:
+            spec = RelatedColumn(field.name, field.related_model)
+        else:
+            spec = (field.name, field.name)
+        if spec is not None:
+            columns.append(compile_column(spec))
+    return columns
+
+
+def iter_rows(queryset: QuerySet, columns: Iterable[ColumnSpec],
+              chunk_size: int = CHUNK_SIZE) -> Iterator[list]:
+    """Yield the header and rows of an export, using a single query.
+
+    Paths spanning multi-valued relations yield a row per related
+    object, as `values_list()` does. Related columns cost an extra query
+    per chunk of rows.
+    """
+    columns = [compile_column(spec) for spec in columns]
+    paths = list(dict.fromkeys(
+        path for column in columns for path in column.paths))
+
+    yield [column.header for column in columns]
+
+    rows = queryset.values_list(*paths).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = [dict(zip(paths, row))
+                 for row in itertools.islice(rows, chunk_size)]
+        if not chunk:
+            return
+        related = {column: column.fetch(chunk) for column in columns
+                   if isinstance(column, RelatedColumn)}
+        for values in chunk:
+            yield [
+                related[column].get(values[column.paths[0]])
+                if column in related else column.get_value(values)
+                for column in columns
+            ]
+
+
+def iter_csv(rows: Iterable[Sequence], rows_per_chunk: int = CHUNK_SIZE,
+             delimiter: str = ';') -> Iterator[bytes]:
+    """Yield rows in CSV format, by chunks of UTF-8 encoded rows.
+
+    The first chunk starts with a byte order mark so that spreadsheet
+    software detects the encoding.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+    yield codecs.BOM_UTF8
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode()
+
+
+# Characters which are not allowed in XML documents.
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'content-types">'
+        '<Default Extension="rels" ContentType="application/'
+        'vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType='
+        '"application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+        '2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/'
+        'spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.'
+        'org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+        '2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value) -> str:
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.replace(tzinfo=None, microsecond=0)
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _iter_xlsx_sheet(rows: Iterable[Sequence],
+                     rows_per_chunk: int) -> Iterator[bytes]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/'
+        'spreadsheetml/2006/main"><sheetData>'
+    ).encode()
+    chunk = []
+    for row in rows:
+        chunk.append('<row>' + ''.join(map(_xlsx_cell, row)) + '</row>')
+        if len(chunk) == rows_per_chunk:
+            yield ''.join(chunk).encode()
+            chunk.clear()
+    yield (''.join(chunk) + '</sheetData></worksheet>').encode()
+
+
+def iter_xlsx(rows: Iterable[Sequence],
+              rows_per_chunk: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield rows as a single-sheet XLSX workbook, by chunks.
+
+    Cells use inline strings so that the sheet can be written in a
+    single pass, without building a shared strings table.
+    """
+    members = [(name, (part.encode(),)) for name, part in _XLSX_PARTS.items()]
+    members.append(('xl/worksheets/sheet1.xml',
+                    _iter_xlsx_sheet(rows, rows_per_chunk)))
+    return iter_zip(members)
+
+
+def csv_response(rows: Iterable[Sequence], filename: str,
+                 **kwargs) -> StreamingHttpResponse:
+    """Return a response streaming rows as a CSV file attachment."""
+    response = StreamingHttpResponse(iter_csv(rows, **kwargs),
+                                     content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+def xlsx_response(rows: Iterable[Sequence], filename: str,
+                  **kwargs) -> StreamingHttpResponse:
+    """Return a response streaming rows as an XLSX file attachment."""
+    content_type = ('application/'
+                    'vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    response = StreamingHttpResponse(iter_xlsx(rows, **kwargs),
+                                     content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+# Columns describing the user of a participation.
+PARTICIPANT_COLUMNS = (
+    Column('user__first_name', header='first_name'),
+    Column('user__last_name', header='last_name'),
+    Column('user__student__school', header='school'),
+    Column('user__student__grade', header='grade'),
+    Column('user__phone_number', header='phone_number'),
+    Column('user__student__scholarship', header='scholarship'),
+)
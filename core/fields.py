@@ -2,7 +2,23 @@
 
 from rest_framework import serializers
 
-from .markdown import add_domain_to_image_files
+from .markdown import (add_domain_to_html_images, add_domain_to_image_files,
+                       render_markdown)
+
+# Query parameter selecting the format of Markdown fields.
+# Note: `format` is reserved by DRF to select the renderer.
+MARKDOWN_FORMAT_PARAM = 'markdown'
+
+
+def get_markdown_format(request) -> str:
+    """Return the format of Markdown fields requested by a client.
+
+    Either 'markdown' (the default) or 'html'.
+    """
+    if request is None:
+        return 'markdown'
+    value = request.GET.get(MARKDOWN_FORMAT_PARAM)
+    return 'html' if value == 'html' else 'markdown'
 
 
 class MarkdownField(serializers.Field):
@@ -11,11 +27,25 @@ class MarkdownField(serializers.Field):
     Mainly ensures that image references contain a complete link
     including the server's host name.
 
+    When the `?markdown=html` query parameter is given, the HTML
+    rendering is returned instead. It is read from the HTML stored by
+    models using `core.models.MarkdownHTMLMixin`, or rendered on the
+    fly for other models.
+
     Should be used on markdownx.MarkdownxField fields.
     """
 
+    def get_attribute(self, instance):
+        if get_markdown_format(self.context.get('request')) != 'html':
+            return super().get_attribute(instance)
+        if self.source in getattr(instance, 'markdown_fields', ()):
+            return instance.get_markdown_html(self.source)
+        return render_markdown(super().get_attribute(instance) or '')
+
     def to_representation(self, obj):
         request = self.context['request']
+        if get_markdown_format(request) == 'html':
+            return add_domain_to_html_images(request, obj)
         return add_domain_to_image_files(request, obj)
 
     def to_internal_value(self, data):
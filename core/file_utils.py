@@ -2,6 +2,15 @@
 
 import os
 import fnmatch
+import posixpath
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from storages.backends.s3boto3 import S3Boto3Storage
 
 
 def locate(pattern, root=os.curdir):
@@ -21,7 +30,28 @@ def find_file(pattern, root=os.curdir):
     raise FileNotFoundError(pattern)
 
 
-def walk(storage, top='/', topdown=True, onerror=None):
+def _walk(listdir, top, topdown, onerror, prefetch=None):
+    try:
+        dirs, nondirs = listdir(top)
+    except (os.error, Exception) as err:
+        if onerror is not None:
+            onerror(err)
+        return
+
+    if topdown:
+        # dirs may be modified in place by the caller to prune the walk,
+        # hence subdirectories are only listed after this yield
+        yield top, dirs, nondirs
+    paths = [os.path.join(top, name) for name in dirs]
+    if prefetch is not None:
+        prefetch(paths)
+    for path in paths:
+        yield from _walk(listdir, path, topdown, onerror, prefetch)
+    if not topdown:
+        yield top, dirs, nondirs
+
+
+def walk(storage, top='/', topdown=True, onerror=None, workers=None):
     """Implement os.walk using a Django storage.
 
     Refer to the documentation of os.walk().
@@ -38,20 +68,311 @@ def walk(storage, top='/', topdown=True, onerror=None):
         Same role and default value as in os.walk().
     onerror : function, optional
         Same role and default value as in os.walk().
+    workers : int, optional
+        If given, the subdirectories of each directory are listed
+        concurrently by a pool of this many threads, while the walk
+        proceeds. This hides the latency of remote storages. Results
+        are yielded in the same order as a sequential walk.
+        Directories are listed one at a time by default.
     """
+    if not workers:
+        yield from _walk(storage.listdir, top, topdown, onerror)
+        return
+
+    # listings which have not been consumed yet, by path
+    futures = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def prefetch(paths):
+            for path in paths:
+                futures[path] = executor.submit(storage.listdir, path)
+
+        def listdir(path):
+            return futures.pop(path).result()
+
+        prefetch([top])
+        try:
+            yield from _walk(listdir, top, topdown, onerror, prefetch)
+        finally:
+            # the walk may be interrupted by the caller
+            for future in futures.values():
+                future.cancel()
+
+
+def _get_s3_client(storage):
+    """Return the S3 client of an S3 storage, None for other storages."""
+    if not isinstance(storage, S3Boto3Storage):
+        return None
+    return storage.connection.meta.client
+
+
+def _get_s3_key(storage, path: str) -> str:
+    return storage._normalize_name(storage._clean_name(path))
+
+
+def list_files(storage, top='', onerror=None,
+               workers=8) -> Iterator[str]:
+    """Yield the files stored below a directory.
+
+    On S3, the whole tree is listed flat, by pages of 1000 keys, instead
+    of one listing per directory.
+
+    Parameters
+    ----------
+    storage : django.Storage
+    top : str, optional
+        The directory to list. Root directory by default.
+    onerror : function, optional
+        Same role as in walk().
+    workers : int, optional
+        Number of directories listed concurrently on storages other than
+        S3, see walk().
+
+    Yields
+    ------
+    path : str
+        The path of each file relative to the storage's root.
+    """
+    client = _get_s3_client(storage)
+    if client is None:
+        for root, dirs, files in walk(storage, top, onerror=onerror,
+                                      workers=workers):
+            for name in files:
+                yield posixpath.join(root, name)
+        return
+
+    prefix = _get_s3_key(storage, top) if top else storage.location
+    location = storage.location.strip('/')
+    if prefix and not prefix.endswith('/'):
+        prefix += '/'
+    paginator = client.get_paginator('list_objects_v2')
     try:
-        dirs, nondirs = storage.listdir(top)
-    except (os.error, Exception) as err:
-        if onerror is not None:
-            onerror(err)
+        for page in paginator.paginate(Bucket=storage.bucket_name,
+                                       Prefix=prefix):
+            for entry in page.get('Contents', ()):
+                key = entry['Key']
+                if key.endswith('/'):
+                    continue
+                yield key[len(location) + 1:] if location else key
+    except Exception as err:
+        if onerror is None:
+            raise
+        onerror(err)
+
+
+def delete_files(storage, paths: Iterable[str],
+                 batch_size=1000) -> List[str]:
+    """Delete files from a storage.
+
+    On S3, files are deleted by batches of `batch_size` keys (1000 at
+    most) instead of one request per file.
+
+    Returns
+    -------
+    failed : list of str
+        Paths of the files which could not be deleted.
+    """
+    paths = list(paths)
+    failed = []
+    client = _get_s3_client(storage)
+
+    if client is None:
+        for path in paths:
+            try:
+                storage.delete(path)
+            except OSError:
+                failed.append(path)
+        return failed
+
+    for start in range(0, len(paths), batch_size):
+        batch = {_get_s3_key(storage, path): path
+                 for path in paths[start:start + batch_size]}
+        response = client.delete_objects(Bucket=storage.bucket_name, Delete={
+            'Objects': [{'Key': key} for key in batch],
+            'Quiet': True,
+        })
+        failed += [batch[error['Key']]
+                   for error in response.get('Errors', ())]
+    return failed
+
+
+def remove_empty_dirs(storage, paths: Iterable[str]):
+    """Remove the directories left empty after deleting files.
+
+    Only the ancestors of the deleted files are inspected, deepest
+    first. S3 has no directories, hence nothing is done there.
+
+    Parameters
+    ----------
+    storage : django.Storage
+    paths : iterable of str
+        Paths of the deleted files.
+    """
+    if _get_s3_client(storage) is not None:
         return
+    dirs = set()
+    for path in paths:
+        path = posixpath.dirname(path)
+        while path and path not in dirs:
+            dirs.add(path)
+            path = posixpath.dirname(path)
+    for path in sorted(dirs, key=lambda path: path.count('/'), reverse=True):
+        try:
+            subdirs, files = storage.listdir(path)
+        except FileNotFoundError:
+            continue
+        if not subdirs and not files:
+            storage.delete(path)
 
-    if topdown:
-        yield top, dirs, nondirs
-    for name in dirs:
-        new_path = os.path.join(top, name)
-        # recursively list subdirectories
-        for top_, dirs_, nondirs_ in walk(storage, top=new_path):
-            yield top_, dirs_, nondirs_
-    if not topdown:
-        yield top, dirs, nondirs
+
+def _read(file) -> List[bytes]:
+    # Open through the storage rather than the FieldFile so that
+    # concurrent reads do not share the FieldFile's file object.
+    with file.storage.open(file.name, 'rb') as f:
+        return list(f.chunks())
+
+
+def _stream(file) -> Iterator[bytes]:
+    with file.storage.open(file.name, 'rb') as f:
+        yield from f.chunks()
+
+
+def prefetch(files, workers=4, max_bytes=None):
+    """Read stored files concurrently and yield them in order.
+
+    Files are downloaded ahead of the consumer by a bounded thread pool,
+    which hides the latency of remote storages (e.g. AWS S3).
+
+    Parameters
+    ----------
+    files : iterable of django.db.models.fields.files.FieldFile
+    workers : int, optional
+        Maximum number of files being downloaded at the same time.
+    max_bytes : int, optional
+        Maximum number of bytes held by files being downloaded or not
+        consumed yet. The size of a file is looked up by the worker
+        which downloads it, and reserved in order before the download
+        starts. It is released once the consumer is done with the file.
+        Files larger than this are not downloaded ahead but streamed by
+        chunks as the consumer reads them. No limit by default.
+
+    Yields
+    ------
+    (file, chunks) : tuple of FieldFile and iterable of bytes
+    """
+    files = iter(files)
+    pending = deque()
+    budget = threading.Condition()
+    reserved = 0
+    # Index of the next file allowed to reserve its size. Reserving in
+    # order ensures the file awaited by the consumer is never blocked by
+    # files after it.
+    turn = 0
+    submitted = 0
+    closed = False
+
+    def fetch(index, file) -> Tuple[int, Optional[List[bytes]]]:
+        nonlocal reserved, turn
+        if max_bytes is None:
+            return 0, _read(file)
+        size = file.size
+        too_large = size > max_bytes
+        with budget:
+            budget.wait_for(lambda: closed or turn == index and (
+                too_large or reserved + size <= max_bytes))
+            if closed:
+                return 0, None
+            turn += 1
+            budget.notify_all()
+            if too_large:
+                # Too large to be held in memory: streamed when consumed.
+                return 0, None
+            reserved += size
+        return size, _read(file)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit() -> bool:
+            nonlocal submitted
+            try:
+                file = next(files)
+            except StopIteration:
+                return False
+            future = executor.submit(fetch, submitted, file)
+            pending.append((file, future))
+            submitted += 1
+            return True
+
+        try:
+            while len(pending) < workers and submit():
+                pass
+            while pending:
+                file, future = pending.popleft()
+                size, chunks = future.result()
+                yield file, _stream(file) if chunks is None else chunks
+                with budget:
+                    reserved -= size
+                    budget.notify_all()
+                while len(pending) < workers and submit():
+                    pass
+        finally:
+            with budget:
+                closed = True
+                budget.notify_all()
+            for _, future in pending:
+                future.cancel()
+
+
+class _ZipBuffer:
+    """Write-only, non-seekable buffer collecting a ZIP archive's bytes.
+
+    Being non-seekable makes zipfile write data descriptors after each
+    member instead of seeking back to patch local headers, which is what
+    allows the archive to be streamed.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        """Return and forget the bytes written since the last call."""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(members: Iterable[Tuple[str, Iterable[bytes]]]
+             ) -> Iterator[bytes]:
+    """Yield a ZIP archive by chunks as its members are produced.
+
+    Parameters
+    ----------
+    members : iterable of (str, iterable of bytes)
+        The path of each member in the archive and its contents, as
+        chunks of bytes.
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip:
+        for name, chunks in members:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            # fix for Linux zip files read in Windows
+            info.create_system = 0
+            with zip.open(info, 'w') as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    data = buffer.pop()
+                    if data:
+                        yield data
+            yield buffer.pop()
+    yield buffer.pop()
@@ -1,14 +1,14 @@
 """Clean unusued media files."""
 
-import os.path
+import posixpath
+from typing import Set, Tuple
 
 from django.apps import apps
-from django.conf import settings
 from django.core.files.storage import default_storage
 from django.core.management import BaseCommand
 from django.db.models import FileField, Q
 
-from core.file_utils import walk as os_walk
+from core.file_utils import delete_files, list_files, remove_empty_dirs
 from core.markdown import extract_md_file_refs
 from markdownx.models import MarkdownxField
 
@@ -22,8 +22,6 @@ class Command(BaseCommand):
     """
 
     help = "Delete all unused media files."
-    media_root = getattr(settings, 'MEDIA_ROOT', '')
-    top = ''
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -32,54 +30,50 @@ class Command(BaseCommand):
             help='Top directory in which to look for unused media files.',
         )
 
-    def get_db_files(self):
+    def get_db_files(self) -> Tuple[Set[str], Set[str]]:
         """Retrieve all references to files in the database.
 
         Returns
         -------
         db_files : set of file paths relative to the MEDIA_ROOT
+        md_files : set of file names referenced in Markdown fields
         """
-        all_models = apps.get_models()
         db_files = set()
+        md_files = set()
 
-        for model in all_models:
-            file_fields = []
-            filters = Q()
+        for model in apps.get_models():
+            manager = model._default_manager
 
-            # FileFields : only retrieve the models which have non-empty,
-            # non-null file fields.
+            # FileFields : only retrieve the non-empty, non-null names,
+            # which are paths relative to the media root.
             for field in model._meta.fields:
-                if isinstance(field, FileField):
-                    file_fields.append(field.name)
-                    is_null = {'{}__isnull'.format(field.name): True}
-                    is_empty = {'{}__exact'.format(field.name): ''}
-                    filters &= Q(**is_null) | Q(**is_empty)
-
-            def get_file_fields(field):
-                for obj in model.objects.exclude(filters):
-                    yield getattr(obj, field)
-
-            for field in file_fields:
-                # field_file.name is the path relative to the media root
-                file_paths = [field_file.name
-                              for field_file in get_file_fields(field)]
-                db_files.update(file_paths)
+                if not isinstance(field, FileField):
+                    continue
+                empty = (Q(**{f'{field.name}__isnull': True}) |
+                         Q(**{f'{field.name}__exact': ''}))
+                db_files.update(
+                    manager.exclude(empty)
+                    .values_list(field.name, flat=True)
+                    .iterator())
 
             # MarkdownxFields can contain references to files in the form
-            # of [](xxx) or ![](xxx).
+            # of [](xxx) or ![](xxx). Their path is seldom relative to the
+            # media root (e.g. /media/xxx or an URL), hence only the file
+            # names are compared.
             # NOTE: URLs may be included but they are not physical files
             # and won't be deleted (see handle()).
-            model_markdown_fields = filter(
-                lambda f: isinstance(f, MarkdownxField), model._meta.fields)
-            for field in model_markdown_fields:
-                for md in model.objects.values_list(field.name, flat=True):
-                    file_refs = extract_md_file_refs(md)
-                    db_files.update(ref.filename for ref in file_refs)
+            for field in model._meta.fields:
+                if not isinstance(field, MarkdownxField):
+                    continue
+                for md in (manager.values_list(field.name, flat=True)
+                           .iterator()):
+                    md_files.update(ref.filename
+                                    for ref in extract_md_file_refs(md or ''))
 
-        return db_files
+        return db_files, md_files
 
-    def get_storage_files(self, location):
-        """Retrieve the set of media files stored in default_storage.
+    def get_storage_files(self, location: str) -> Set[str]:
+        """Retrieve the media files stored in default_storage.
 
         Parameters
         ----------
@@ -91,78 +85,44 @@ class Command(BaseCommand):
         -------
         storage_files : set of file paths relative to the MEDIA_ROOT
         """
-        storage_files = set()
-
-        if not self.media_root:
-            return storage_files
-
         def onerror(e):
             self.stdout.write(self.style.ERROR(str(e)))
 
-        # Get all files from location, recursively
-        for dir_root, dirs, files in os_walk(default_storage, location,
-                                             onerror=onerror):
-            # dir_root is the absolute path except the filename
-            # files contains filenames
-            dir_relative_to_media_root = dir_root.replace(self.media_root, '')
-            # remove leading slash
-            dir_relative_to_media_root = dir_relative_to_media_root.lstrip('/')
-            for file_ in files:
-                file_path = os.path.join(dir_relative_to_media_root, file_)
-                storage_files.add(file_path)
-
-        return storage_files
-
-    def clean_files(self, deletables):
+        return set(list_files(default_storage, location, onerror=onerror))
+
+    def clean_files(self, deletables) -> Tuple[int, int]:
         """Remove a list of files from default_storage."""
-        deleted = 0
-        # Record files not found for safety measure.
-        # Normally, all deletables should be existing files.
-        not_found = 0
-
-        # Delete files
-        for file_ in deletables:
-            try:
-                default_storage.delete(file_)
-                deleted += 1
-            except FileNotFoundError as e:
-                not_found += 1
-
-        # Delete all empty folders
-        for dir_root, dirs, files in os_walk(default_storage, self.media_root,
-                                             topdown=False):
-            for dir_ in dirs:
-                # build the path relative to the media_root
-                dir_path = os.path.join(dir_root, dir_)
-                dir_path = dir_path.replace(self.media_root, '').lstrip('/')
-                # check the contents of the directory
-                dirs_here, non_dirs_here = default_storage.listdir(dir_path)
-                if not dirs_here and not non_dirs_here:
-                    default_storage.delete(dir_path)
-
-        return deleted, not_found
+        failed = delete_files(default_storage, deletables)
+        deleted = set(deletables) - set(failed)
+        # Delete the folders left empty
+        remove_empty_dirs(default_storage, deleted)
+        return len(deleted), len(failed)
 
     def handle(self, *args, **options):
         """Find unused media files and delete them."""
         location = options.get('top') or ''
 
-        db_files = self.get_db_files()
+        db_files, md_files = self.get_db_files()
         storage_files = self.get_storage_files(location=location)
 
         # Delete physical files that have no references in the DB.
         # NOTE: DB files that are not physical files will not be included.
         # This means that potential URLs detected in Markdown fields
         # are not considered as deletables, which is an expected behavior.
-        deletables = storage_files - db_files
+        deletables = {
+            path for path in storage_files
+            if path not in db_files
+            and posixpath.basename(path) not in md_files
+        }
 
-        self.stdout.write(f'DB files: {db_files}')
-        self.stdout.write(f'Storage files: {storage_files}')
-        self.stdout.write(f'Deletables: {deletables}')
+        self.stdout.write(f'DB files: {len(db_files)}')
+        self.stdout.write(f'Storage files: {len(storage_files)}')
+        self.stdout.write(f'Deletables: {len(deletables)}')
 
         if deletables:
             self.stdout.write(
                 self.style.NOTICE('Unused media files were detected:'))
-            self.stdout.write('\n'.join(f_ for f_ in deletables))
+            self.stdout.write('\n'.join(f_ for f_ in sorted(deletables)))
 
             deleted, not_found = self.clean_files(deletables)
 
@@ -1,15 +1,28 @@
 """Markdown utilities."""
 
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Generator as Gen
 import re
 from pathlib import Path
 
+from markdown import Markdown
+from markdownx.settings import (MARKDOWNX_MARKDOWN_EXTENSION_CONFIGS,
+                                MARKDOWNX_MARKDOWN_EXTENSIONS)
+
+from .settings import settings
+
+_local = threading.local()
+
 
 class MdFileRef:
     """Represents a Markdown file reference."""
 
     str_format = '[{legend}]({file_path})'
     pattern = r'\[(?P<legend>.*?)\]\((?P<file_path>.*?)\)'
+    regex = re.compile(pattern)
 
     def __init__(self, legend: str='', file_path: str=''):
         self.legend = legend
@@ -21,8 +34,7 @@ class MdFileRef:
 
         Returns iterable of MdFileRef objects.
         """
-        pattern = re.compile(cls.pattern)
-        for match in pattern.finditer(text):
+        for match in cls.regex.finditer(text):
             yield cls(legend=match.group('legend'),
                       file_path=match.group('file_path'))
 
@@ -43,6 +55,7 @@ class MdImageRef(MdFileRef):
 
     str_format = '!' + MdFileRef.str_format
     pattern = r'!' + MdFileRef.pattern
+    regex = re.compile(pattern)
 
 
 def extract_md_file_refs(markdown_text: str) -> Gen[MdImageRef, None, None]:
@@ -57,24 +70,105 @@ def extract_image_refs(markdown_text: str) -> Gen[MdImageRef, None, None]:
         yield ref
 
 
+def render_markdown(content: str) -> str:
+    """Render Markdown text as HTML, the same way the admin previews it.
+
+    A single `Markdown` instance is configured per thread
+    (instances are stateful and not thread-safe) and reset between
+    conversions.
+    """
+    md = getattr(_local, 'markdown', None)
+    if md is None:
+        md = _local.markdown = Markdown(
+            extensions=MARKDOWNX_MARKDOWN_EXTENSIONS,
+            extension_configs=MARKDOWNX_MARKDOWN_EXTENSION_CONFIGS)
+    return md.reset().convert(content)
+
+
+def get_source_hash(content: str) -> str:
+    """Return a hash identifying a Markdown source text."""
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def _memoize(func):
+    """Memoize a function of a domain and a text, keyed by the text's hash.
+
+    Keys do not hold the (possibly long) texts, only their hash. The
+    CORE_MARKDOWN_CACHE_SIZE most recent results are kept.
+    """
+    results = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def memoized(domain: str, text: str) -> str:
+        key = (domain, get_source_hash(text))
+        with lock:
+            try:
+                results.move_to_end(key)
+                return results[key]
+            except KeyError:
+                pass
+        result = func(domain, text)
+        with lock:
+            results[key] = result
+            while len(results) > settings.CORE_MARKDOWN_CACHE_SIZE:
+                results.popitem(last=False)
+        return result
+
+    memoized.results = results
+    return memoized
+
+
 def _get_domain(request):
     schema = 'https://' if request.is_secure() else 'http://'
     return schema + request.get_host()
 
 
+@_memoize
+def _add_domain(domain: str, content: str) -> str:
+    def replace(match) -> str:
+        file_path = match.group('file_path')
+        # skip links to external images
+        if file_path.startswith('http'):
+            return match.group(0)
+        return str(MdImageRef(legend=match.group('legend'),
+                              file_path=domain + file_path))
+
+    return MdImageRef.regex.sub(replace, content)
+
+
 def add_domain_to_image_files(request, content: str) -> str:
     """Add domain to image file path in image references.
 
     This allows to get full URL to image inside ![]() tags,
     and allows a foreign server that has access to the backend server
     to render them directly.
+
+    References are rewritten in a single pass, and results are memoized
+    by domain and hash of the content (see CORE_MARKDOWN_CACHE_SIZE) as
+    the same contents are served over and over.
     """
-    domain = _get_domain(request)
-    for ref in MdImageRef.find(content):
+    return _add_domain(_get_domain(request), content)
+
+
+_IMG_SRC_RE = re.compile(r'(<img\b[^>]*?\bsrc=")([^"]*)"')
+
+
+@_memoize
+def _add_domain_html(domain: str, html: str) -> str:
+    def replace(match) -> str:
+        src = match.group(2)
         # skip links to external images
-        if ref.file_path.startswith('http'):
-            continue
-        new_ref = MdImageRef(legend=ref.legend,
-                             file_path=domain + ref.file_path)
-        content = content.replace(str(ref), str(new_ref))
-    return content
+        if src.startswith('http'):
+            return match.group(0)
+        return f'{match.group(1)}{domain}{src}"'
+
+    return _IMG_SRC_RE.sub(replace, html)
+
+
+def add_domain_to_html_images(request, html: str) -> str:
+    """Add domain to the source of images in HTML rendered from Markdown.
+
+    HTML counterpart of `add_domain_to_image_files()`.
+    """
+    return _add_domain_html(_get_domain(request), html)
@@ -0,0 +1,25 @@
+# Generated by Django 2.2 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_markdown_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100, unique=True, verbose_name='modèle')),
+                ('stamp', models.CharField(max_length=32, verbose_name='version')),
+            ],
+            options={
+                'verbose_name': 'version de modèle',
+                'verbose_name_plural': 'versions de modèles',
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
 """Core models."""
 
+from typing import List
+
 from django.db import models
 from django.shortcuts import reverse
 from django.utils.text import slugify
@@ -7,8 +9,79 @@ from django.utils.text import slugify
 from django_countries.fields import CountryField
 from markdownx.models import MarkdownxField
 
+from .markdown import get_source_hash, render_markdown
+
+
+class MarkdownHTMLMixin:
+    """Store the HTML rendering of Markdown fields.
+
+    For each field listed in `markdown_fields`, the model must define
+    a `<field>_html` text field, which holds the HTML rendering, and a
+    `<field>_hash` char field (max_length=40), which holds the hash of
+    the rendered source.
+
+    The HTML is refreshed when the model is saved. Existing rows are
+    rendered by the migration adding the fields. If the HTML does not
+    match the source anymore when it is read (e.g. after a
+    `QuerySet.update()`), it is rendered again but not stored, so that
+    reading never writes to the database.
+
+    Class attributes
+    ----------------
+    markdown_fields : tuple
+        Names of the Markdown fields.
+    """
+
+    markdown_fields = ()
+
+    def refresh_markdown_html(self, *names: str) -> List[str]:
+        """Render Markdown fields whose source changed.
+
+        Parameters
+        ----------
+        *names : str
+            Names of the Markdown fields to refresh.
+            Defaults to all of them.
+
+        Returns
+        -------
+        updated : list of str
+            Names of the model fields which have been updated.
+        """
+        updated = []
+        for name in names or self.markdown_fields:
+            source = getattr(self, name) or ''
+            source_hash = get_source_hash(source)
+            if getattr(self, f'{name}_hash') != source_hash:
+                setattr(self, f'{name}_html', render_markdown(source))
+                setattr(self, f'{name}_hash', source_hash)
+                updated += [f'{name}_html', f'{name}_hash']
+        return updated
+
+    def get_markdown_html(self, name: str) -> str:
+        """Return the HTML rendering of a Markdown field.
+
+        If it is out of date, the HTML is rendered again. It will only be
+        stored the next time the object is saved.
+        """
+        self.refresh_markdown_html(name)
+        return getattr(self, f'{name}_html')
 
-class Document(models.Model):
+    def save(self, *args, **kwargs):
+        """Refresh the HTML of the saved Markdown fields."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_markdown_html()
+        else:
+            names = [name for name in self.markdown_fields
+                     if name in update_fields]
+            if names:
+                updated = self.refresh_markdown_html(*names)
+                kwargs['update_fields'] = list(update_fields) + updated
+        super().save(*args, **kwargs)
+
+
+class Document(MarkdownHTMLMixin, models.Model):
     """Represents a simple document, with a title and a text content.
 
     Markdown support integrated.
@@ -24,6 +97,11 @@ class Document(models.Model):
     content = MarkdownxField(
         'contenu',
         help_text="Contenu du document (Markdown est supporté).")
+    content_html = models.TextField(editable=False, blank=True, default='')
+    content_hash = models.CharField(
+        max_length=40, editable=False, blank=True, default='')
+
+    markdown_fields = ('content',)
 
     class Meta:  # noqa
         ordering = ('title',)
@@ -76,3 +154,17 @@ class Address(models.Model):
             self.post_code + ' ' + self.city,
             self.country.name,
         ]))
+
+
+class ModelVersion(models.Model):
+    """Represents the version stamp of a model (see `core.versions`)."""
+
+    label = models.CharField('modèle', max_length=100, unique=True)
+    stamp = models.CharField('version', max_length=32)
+
+    class Meta:  # noqa
+        verbose_name = 'version de modèle'
+        verbose_name_plural = 'versions de modèles'
+
+    def __str__(self):
+        return f'{self.label} ({self.stamp})'
@@ -0,0 +1,49 @@
+"""API pagination."""
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import pagination
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Opt-in keyset pagination.
+
+    Lists are only paginated when the `page_size` query parameter is given,
+    e.g. `/api/visits/?page_size=20`, and the complete list is returned
+    otherwise. Following pages are obtained through the `next` link.
+
+    Pages are delimited by the value of the first field of the model's
+    default ordering (`Meta.ordering`) instead of an OFFSET, so fetching a
+    page costs the same whatever its depth. Views may declare a
+    `cursor_ordering` attribute to use another ordering.
+
+    Only the first ordering field is part of the cursor: rows sharing its
+    value with the last row of a page are skipped with an OFFSET (capped
+    by `offset_cutoff`). That field should thus have few duplicates, and
+    it cannot be nullable as NULL values cannot be compared to a cursor.
+    """
+
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view) -> tuple:
+        """Return the ordering of the view or of the model.
+
+        The primary key is added as a tie-breaker so that rows sharing the
+        same position are always returned in the same order, which the
+        OFFSET used to skip them relies on.
+        """
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is None:
+            ordering = queryset.model._meta.ordering or ('pk',)
+        ordering = tuple(ordering)
+        name = ordering[0].lstrip('-')
+        if name != 'pk' and queryset.model._meta.get_field(name).null:
+            raise ImproperlyConfigured(
+                f'Cannot paginate {queryset.model.__name__} objects by '
+                f'the nullable "{name}" field, set a `cursor_ordering` '
+                'on the view.')
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            descending = ordering[0].startswith('-')
+            ordering += ('-pk' if descending else 'pk',)
+        return ordering
@@ -0,0 +1,13 @@
+"""Core settings."""
+
+from django.conf import settings
+from utils import setdefault
+
+
+# Seconds during which serialized representations are cached
+# (they are also invalidated when the underlying data changes)
+setdefault(settings, 'CORE_REPRESENTATION_CACHE_TIMEOUT', 3600)
+
+# Number of Markdown contents whose image references rewritten with the
+# server's domain are kept in memory
+setdefault(settings, 'CORE_MARKDOWN_CACHE_SIZE', 512)
@@ -0,0 +1,65 @@
+"""Per-model version stamps.
+
+Each tracked model has a version stamp stored in the database, which is
+renewed whenever an instance of the model is saved or deleted, once the
+transaction is committed. Data derived from the model's instances (ETags,
+cached representations…) can be keyed by version stamps, so that it is
+invalidated as soon as the underlying data changes, in every process.
+"""
+
+from typing import Dict, Iterable
+from uuid import uuid4
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import ModelVersion
+
+
+def get_versions(models: Iterable) -> Dict[str, str]:
+    """Return the version stamps of models, keyed by model label.
+
+    Costs a single query. Models which were never modified have an
+    empty stamp.
+    """
+    labels = [model._meta.label_lower for model in models]
+    stamps = dict(
+        ModelVersion.objects
+        .filter(label__in=labels)
+        .values_list('label', 'stamp')
+    )
+    return {label: stamps.get(label, '') for label in labels}
+
+
+def _renew(label: str):
+    stamp = uuid4().hex
+    updated = ModelVersion.objects.filter(label=label).update(stamp=stamp)
+    if not updated:
+        ModelVersion.objects.get_or_create(
+            label=label, defaults={'stamp': stamp})
+
+
+def bump_version(model):
+    """Renew the version stamp of a model.
+
+    The stamp is renewed once the current transaction (if any) commits,
+    so that a new stamp is never associated with uncommitted data.
+    """
+    label = model._meta.label_lower
+    transaction.on_commit(lambda: _renew(label))
+
+
+def _bump_version(sender, **kwargs):
+    bump_version(sender)
+
+
+def track_versions(*models):
+    """Renew the version stamp of models when instances are saved or deleted.
+
+    Note: queryset `.update()` calls do not send signals, hence
+    must be followed by a call to `bump_version()`.
+    """
+    for model in models:
+        uid = f'track_versions:{model._meta.label_lower}'
+        post_save.connect(_bump_version, sender=model, dispatch_uid=uid)
+        post_delete.connect(_bump_version, sender=model, dispatch_uid=uid)
@@ -1,59 +1,149 @@
 """Data export utilities."""
 
 
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
 import os
-import zipfile
 import csv
 from io import BytesIO, StringIO
-from .models import Form
+from .models import Form, FormEntry, Question
+from .settings import settings
+from core.file_utils import iter_zip, prefetch
 from django.db.models.fields.files import FieldFile
 
+# Number of rows fetched per round trip when streaming form entries.
+CHUNK_SIZE = 2000
 
-def _get_rows(form: Form) -> List[List[str]]:
-    """Return CSV rows of form entries, including the header row."""
-    rows = []
 
-    sections = form.sections.prefetch_related('questions').all()
+def _get_columns(form: Form) -> List[Tuple[str, int]]:
+    """Return the (header, question ID) pair of each question of a form.
 
-    def sections_questions():
-        for section in sections:
-            for question in section.questions.all():
-                yield section, question
+    Questions are grouped by section, ordered by position, then by primary
+    key among sections or questions sharing the same position.
+    Costs a single query.
+    """
+    questions = (
+        Question.objects
+        .filter(section__form=form)
+        .order_by('section__order', 'section__pk', 'order', 'pk')
+        .values_list('section__title', 'text', 'pk')
+    )
+    return [(f'{section}: {text}', pk) for section, text, pk in questions]
 
-    def build_row(entry) -> List[str]:
-        row = [entry.submitted.strftime("%Y-%m-%d %H:%M")]
-        for _, question in sections_questions():
-            answer = entry.answers.filter(question=question).first()
-            value: str = answer and (answer.answer or '') or ''
-            row.append(value)
-        return row
 
-    # Build the header row
-    headers = ['Soumis le']
-    for section, question in sections_questions():
-        headers.append(f'{section.title}: {question.text}')
+def _iter_rows(form: Form) -> Iterator[List[str]]:
+    """Yield CSV rows of form entries, starting with the header row.
 
-    rows.append(headers)
+    The answers of all entries are fetched in a single query, ordered by
+    entry, and pivoted into rows as they stream in. The number of queries
+    does not depend on the number of entries or questions.
+    """
+    columns = _get_columns(form)
+    yield ['Soumis le'] + [header for header, _ in columns]
 
-    # Add a row for each form entry
-    for entry in form.entries.prefetch_related('answers').all():
-        row = build_row(entry)
-        rows.append(row)
+    position = {pk: index for index, (_, pk) in enumerate(columns)}
+
+    # LEFT JOIN on answers so that entries without answers get a row too.
+    answers = (
+        FormEntry.objects
+        .filter(form=form)
+        .order_by('-submitted', 'pk', 'answers__pk')
+        .values_list('pk', 'submitted', 'answers__question_id',
+                     'answers__answer')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
 
-    return rows
+    entry_id = None
+    row: List[str] = None
+    answered = set()
+    for pk, submitted, question_id, answer in answers:
+        if pk != entry_id:
+            if row is not None:
+                yield row
+            entry_id = pk
+            row = [submitted.strftime("%Y-%m-%d %H:%M")]
+            row += [''] * len(columns)
+            answered.clear()
+        index = position.get(question_id)
+        # Keep the first answer if a question was answered multiple times
+        if index is not None and index not in answered:
+            answered.add(index)
+            row[index + 1] = answer or ''
+    if row is not None:
+        yield row
+
+
+def _get_rows(form: Form) -> List[List[str]]:
+    """Return CSV rows of form entries, including the header row."""
+    return list(_iter_rows(form))
 
 
 def _write_csv(form: Form, stream):
     """Write a form's entries into a stream in CSV format."""
     writer = csv.writer(stream)
 
-    for row in _get_rows(form):
+    for row in _iter_rows(form):
         writer.writerow(row)
 
     return stream
 
 
+def _iter_csv(form: Form, rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """Yield a form's entries in CSV format, by chunks of encoded rows."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    for count, row in enumerate(_iter_rows(form), 1):
+        writer.writerow(row)
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode()
+
+
+def iter_forms_zip(forms, folder='forms') -> Iterator[bytes]:
+    """Yield a ZIP of CSV files of forms' entries, by chunks."""
+    members = (
+        (os.path.join(folder, f'{form.slug}.csv'), _iter_csv(form))
+        for form in forms
+    )
+    return iter_zip(members)
+
+
+def iter_files_zip(files: Iterable[FieldFile], folder: str = '',
+                   workers: int = None, max_bytes: int = None
+                   ) -> Iterator[bytes]:
+    """Yield a ZIP of stored files, by chunks.
+
+    Files are downloaded concurrently ahead of the ZIP writer, which
+    consumes them in order.
+
+    Parameters
+    ----------
+    files : iterable of FieldFile
+    folder : str, optional
+        Folder of the files in the archive.
+    workers : int, optional
+        Number of concurrent downloads.
+        Defaults to DYNAMICFORMS_PREFETCH_WORKERS.
+    max_bytes : int, optional
+        Number of bytes that can be downloaded ahead of the ZIP writer.
+        Larger files are streamed by chunks instead.
+        Defaults to DYNAMICFORMS_PREFETCH_MAX_BYTES.
+    """
+    if workers is None:
+        workers = settings.DYNAMICFORMS_PREFETCH_WORKERS
+    if max_bytes is None:
+        max_bytes = settings.DYNAMICFORMS_PREFETCH_MAX_BYTES
+    members = (
+        (os.path.join(folder, os.path.basename(file.name)), chunks)
+        for file, chunks in prefetch(files, workers=workers,
+                                     max_bytes=max_bytes)
+    )
+    return iter_zip(members)
+
+
 def write_zip(forms, stream=None, folder='forms'):
     """Write forms' entries into a zip of CSV files."""
     if stream is None:
@@ -63,26 +153,15 @@ def write_zip(forms, stream=None, folder='forms'):
         'cannot write binary zip file contents to a StringIO object, '
         'consider using BytesIO instead'
     )
-    with zipfile.ZipFile(stream, 'w') as zip:
-        for form in forms:
-            csv_file = StringIO()
-            _write_csv(form, csv_file)
-            csv_filename = os.path.join(folder, f'{form.slug}.csv')
-            value = csv_file.getvalue()
-            zip.writestr(csv_filename, value.encode())
+    for chunk in iter_forms_zip(forms, folder=folder):
+        stream.write(chunk)
     return stream
 
 
 def files_zip(files: List[FieldFile], folder: str='') -> BytesIO:
     """Write form's files into a ZIP."""
     stream = BytesIO()
-    with zipfile.ZipFile(stream, 'w') as zip:
-        for file in files:
-            dest = os.path.join(folder, os.path.basename(file.name))
-            contents = file.read()
-            zip.writestr(dest, contents)
-        # fix for Linux zip files read in Windows
-        for file in zip.filelist:
-            file.create_system = 0
+    for chunk in iter_files_zip(files, folder=folder):
+        stream.write(chunk)
     stream.seek(0)
     return stream
@@ -2,6 +2,9 @@
 
 from typing import List
 from rest_framework import serializers
+
+from core.caching import CachedRepresentationMixin
+
 from .models import Form, Section, Question, Answer, FormEntry, File
 
 
@@ -42,8 +45,16 @@ class FormSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
-class FormDetailSerializer(FormSerializer):
-    """Serializer for form detail."""
+class FormDetailSerializer(CachedRepresentationMixin, FormSerializer):
+    """Serializer for form detail.
+
+    Representations are cached until the form, its sections, questions
+    or files change.
+    """
+
+    cache_version_models = (Form, Section, Question, File)
+    # changes with each new entry
+    uncached_fields = ('entries_count',)
 
     sections = SectionSerializer(many=True)
     files = FileSerializer(many=True)
@@ -52,15 +63,57 @@ class FormDetailSerializer(FormSerializer):
         fields = FormSerializer.Meta.fields + ('sections', 'files',)
 
 
+class QuestionField(serializers.PrimaryKeyRelatedField):
+    """Primary key field for questions.
+
+    If `questions` is set to a mapping of question IDs to questions
+    (typically fetched with `in_bulk()`), questions are looked up in it
+    instead of being fetched one by one.
+    """
+
+    questions = None
+
+    def to_internal_value(self, data):
+        if self.questions is None:
+            return super().to_internal_value(data)
+        try:
+            return self.questions[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class AnswerListSerializer(serializers.ListSerializer):
+    """List serializer for answers.
+
+    Resolves the questions of all answers in a single query.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            pks = set()
+            for item in data:
+                try:
+                    pks.add(int(item['question']))
+                except (KeyError, TypeError, ValueError):
+                    # Invalid items are reported by the question field.
+                    pass
+            field = self.child.fields['question']
+            field.questions = Question.objects.in_bulk(pks)
+        return super().to_internal_value(data)
+
+
 class AnswerSerializer(serializers.ModelSerializer):
     """Serializer for submitting answers."""
 
-    question = serializers.PrimaryKeyRelatedField(
+    question = QuestionField(
         queryset=Question.objects.all(),
     )
 
     class Meta:  # noqa
         model = Answer
+        list_serializer_class = AnswerListSerializer
         fields = ('id', 'question', 'entry', 'answer')
         extra_kwargs = {
             'entry': {'read_only': True},
@@ -76,17 +129,19 @@ class FormEntrySerializer(serializers.ModelSerializer):
     answers = AnswerSerializer(many=True)
 
     def create(self, validated_data: dict) -> FormEntry:
-        """Create a form entry for validated input data."""
+        """Create a form entry for validated input data.
+
+        Answers are inserted with a single query.
+        """
         form = validated_data['form']
         answers: List[dict] = validated_data['answers']
-        answer_serializer = AnswerSerializer()
 
         form_entry = FormEntry.objects.create(form=form)
 
-        # Assign the newly created entry to each answer
-        for answer_data in answers:
-            answer = answer_serializer.create(answer_data)
-            form_entry.answers.add(answer)
+        Answer.objects.bulk_create(
+            Answer(entry=form_entry, **answer_data)
+            for answer_data in answers
+        )
 
         return form_entry
 
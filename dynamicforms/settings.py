@@ -0,0 +1,12 @@
+"""Dynamic forms settings."""
+
+from django.conf import settings
+from utils import setdefault
+
+
+# Form files archives settings
+# Number of files downloaded from the storage at the same time
+setdefault(settings, 'DYNAMICFORMS_PREFETCH_WORKERS', 4)
+# Maximum number of bytes downloaded ahead of the ZIP writer,
+# including downloads in progress
+setdefault(settings, 'DYNAMICFORMS_PREFETCH_MAX_BYTES', 32 * 1024 * 1024)
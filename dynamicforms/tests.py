@@ -1,9 +1,18 @@
 """Dynamic forms tests."""
 
+import threading
+import time
+import zipfile
 from io import StringIO, BytesIO
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
 from django.test import TestCase
-from .models import Form, Section, Question, FormEntry, Answer
-from .exports import _write_csv, _get_rows, write_zip
+from .models import Form, Section, Question, FormEntry, Answer, File
+from .exports import (_write_csv, _get_columns, _get_rows, write_zip,
+                      iter_files_zip)
+from .serializers import FormEntrySerializer
+from .views import download_files_zip
+from core.file_utils import prefetch
 
 
 class WriteCsvTest(TestCase):
@@ -64,3 +73,264 @@ class WriteCsvTest(TestCase):
         write_zip([self.form], stream=stream)
         stream.seek(0)
         stream.read()
+
+    def test_write_zip_contains_csv_of_each_form(self):
+        stream = write_zip([self.form], folder='answers')
+        with zipfile.ZipFile(stream) as zip:
+            self.assertIsNone(zip.testzip())
+            contents = zip.read(f'answers/{self.form.slug}.csv').decode()
+        expected = StringIO()
+        _write_csv(self.form, expected)
+        self.assertEqual(contents, expected.getvalue())
+
+
+class ExportQueryCountTest(TestCase):
+    """Test the CSV export uses a fixed number of queries."""
+
+    def setUp(self):
+        self.form = Form.objects.create(title='Survey')
+        section = Section.objects.create(form=self.form, title='General')
+        self.questions = [
+            Question.objects.create(
+                text=f'Question {i}', type=Question.TYPE_TEXT_SMALL,
+                section=section, order=i)
+            for i in range(5)
+        ]
+
+    def create_entries(self, n):
+        for i in range(n):
+            entry = FormEntry.objects.create(form=self.form)
+            for question in self.questions:
+                Answer.objects.create(question=question, entry=entry,
+                                      answer=f'{i}-{question.order}')
+
+    def test_query_count_does_not_depend_on_entries(self):
+        self.create_entries(2)
+        with self.assertNumQueries(2):
+            rows = _get_rows(self.form)
+        self.assertEqual(len(rows), 3)
+        self.create_entries(20)
+        with self.assertNumQueries(2):
+            rows = _get_rows(self.form)
+        self.assertEqual(len(rows), 23)
+
+    def test_entries_without_answers_have_a_row(self):
+        entry = FormEntry.objects.create(form=self.form)
+        rows = _get_rows(self.form)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][0],
+                         entry.submitted.strftime("%Y-%m-%d %H:%M"))
+        self.assertListEqual(rows[1][1:], [''] * len(self.questions))
+
+    def test_answers_are_pivoted_into_columns(self):
+        self.create_entries(1)
+        rows = _get_rows(self.form)
+        self.assertListEqual(rows[1][1:],
+                             [f'0-{i}' for i in range(len(self.questions))])
+
+
+    def test_columns_are_grouped_by_section(self):
+        form = Form.objects.create(title='Registration')
+        first = Section.objects.create(form=form, title='A', order=0)
+        second = Section.objects.create(form=form, title='B', order=0)
+        # questions of both sections share the same position
+        for text in ('1', '2'):
+            for section in (second, first):
+                Question.objects.create(
+                    text=text, type=Question.TYPE_TEXT_SMALL,
+                    section=section, order=0)
+        headers = [header for header, _ in _get_columns(form)]
+        self.assertListEqual(headers, ['A: 1', 'A: 2', 'B: 1', 'B: 2'])
+
+
+class FilesZipTest(TestCase):
+    """Test the streamed ZIP of form files."""
+
+    def setUp(self):
+        self.form = Form.objects.create(title='Documents')
+        self.file = File.objects.create(
+            name='Autorisation', form=self.form,
+            file=ContentFile(b'%PDF' * 50000, name='autorisation.pdf'))
+
+    def tearDown(self):
+        self.file.file.delete()
+
+    def test_iter_files_zip_yields_chunks_of_a_valid_zip(self):
+        chunks = list(iter_files_zip([self.file.file], folder='docs'))
+        self.assertGreater(len(chunks), 1)
+        with zipfile.ZipFile(BytesIO(b''.join(chunks))) as zip:
+            self.assertIsNone(zip.testzip())
+            name = 'docs/' + self.file.file.name.split('/')[-1]
+            self.assertEqual(zip.read(name), b'%PDF' * 50000)
+
+    def test_download_files_zip_is_streamed(self):
+        response = download_files_zip(None, form=self.form, folder='docs')
+        self.assertTrue(response.streaming)
+        contents = b''.join(response.streaming_content)
+        with zipfile.ZipFile(BytesIO(contents)) as zip:
+            self.assertEqual(len(zip.namelist()), 1)
+
+    def test_download_files_zip_without_form_is_empty_zip(self):
+        response = download_files_zip(None, form=None, folder='docs')
+        contents = b''.join(response.streaming_content)
+        with zipfile.ZipFile(BytesIO(contents)) as zip:
+            self.assertEqual(zip.namelist(), [])
+
+
+class SlowStorage(FileSystemStorage):
+    """File system storage with artificial latency, like a remote storage.
+
+    Looking up the size of a file is as slow as opening it, like a HEAD
+    request. Records the maximum number of files opened at the same
+    time. When a barrier is given, files are only opened once enough of
+    them are being opened at the same time.
+    """
+
+    latency = 0.05
+
+    def __init__(self, *args, barrier=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.barrier = barrier
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.opened = 0
+
+    def _open(self, name, mode='rb'):
+        with self.lock:
+            self.opened += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        if self.barrier is not None:
+            self.barrier.wait()
+        else:
+            time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        return super()._open(name, mode)
+
+    def size(self, name):
+        time.sleep(self.latency)
+        return super().size(name)
+
+
+class PrefetchFilesZipTest(TestCase):
+    """Test files are downloaded concurrently when building a ZIP."""
+
+    num_files = 8
+
+    def setUp(self):
+        self.form = Form.objects.create(title='Documents')
+        self.files = [
+            File.objects.create(
+                name=f'Document {i}', form=self.form,
+                file=ContentFile(str(i).encode() * 1000, name=f'doc{i}.pdf'))
+            for i in range(self.num_files)
+        ]
+        self.storage = SlowStorage()
+        for file in self.files:
+            file.file.storage = self.storage
+
+    def tearDown(self):
+        for file in self.files:
+            file.file.delete()
+
+    def build_zip(self, **kwargs) -> zipfile.ZipFile:
+        field_files = [file.file for file in self.files]
+        chunks = iter_files_zip(field_files, folder='docs', **kwargs)
+        return zipfile.ZipFile(BytesIO(b''.join(chunks)))
+
+    def test_files_are_zipped_in_order(self):
+        with self.build_zip(workers=4) as archive:
+            names = [name.split('/')[-1] for name in archive.namelist()]
+            expected = [file.file.name.split('/')[-1] for file in self.files]
+            self.assertListEqual(names, expected)
+            for name, file in zip(archive.namelist(), self.files):
+                self.assertEqual(archive.read(name),
+                                 file.name[-1].encode() * 1000)
+
+    def test_downloads_are_concurrent(self):
+        # Downloads only go through once 4 of them overlap: sequential
+        # downloads would break the barrier.
+        self.storage.barrier = threading.Barrier(4, timeout=5)
+        self.build_zip(workers=4).close()
+        self.assertEqual(self.storage.max_active, 4)
+        self.assertFalse(self.storage.barrier.broken)
+
+    def test_size_lookups_are_concurrent(self):
+        start = time.perf_counter()
+        self.build_zip(workers=4, max_bytes=32 * 1024 * 1024).close()
+        elapsed = time.perf_counter() - start
+        # each file costs a size lookup and a download: done sequentially,
+        # this would take num_files * 2 * latency (0.8s).
+        expected = self.num_files / 4 * 2 * self.storage.latency
+        self.assertLess(elapsed, 2 * expected)
+
+    def test_byte_budget_counts_downloads_in_flight(self):
+        files = prefetch((file.file for file in self.files),
+                         workers=4, max_bytes=2500)
+        next(files)
+        # 2 files fit in the budget, the third one waits for a release.
+        deadline = time.perf_counter() + 5
+        while self.storage.opened < 2 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        time.sleep(4 * self.storage.latency)
+        self.assertEqual(self.storage.opened, 2)
+        files.close()
+
+    def test_files_larger_than_budget_are_streamed(self):
+        files = prefetch((file.file for file in self.files),
+                         workers=4, max_bytes=500)
+        _, chunks = next(files)
+        # not downloaded ahead of the consumer
+        self.assertEqual(self.storage.opened, 0)
+        self.assertEqual(b''.join(chunks), b'0' * 1000)
+        files.close()
+
+
+class FormEntrySerializerTest(TestCase):
+    """Test submitting form entries."""
+
+    num_questions = 50
+
+    def setUp(self):
+        self.form = Form.objects.create(title='Registration')
+        section = Section.objects.create(form=self.form, title='Student')
+        self.questions = [
+            Question.objects.create(
+                text=f'Question {i}', type=Question.TYPE_TEXT_SMALL,
+                section=section)
+            for i in range(self.num_questions)
+        ]
+
+    def get_data(self, questions=None) -> dict:
+        if questions is None:
+            questions = [question.pk for question in self.questions]
+        return {
+            'form': self.form.pk,
+            'answers': [{'question': question, 'answer': f'Answer {i}'}
+                        for i, question in enumerate(questions)],
+        }
+
+    def test_create_costs_fixed_number_of_queries(self):
+        serializer = FormEntrySerializer(data=self.get_data())
+        # form, questions, entry, answers
+        with self.assertNumQueries(4):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            entry = serializer.save()
+        answers = entry.answers.order_by('question__pk')
+        self.assertEqual(answers.count(), self.num_questions)
+        self.assertEqual(answers[0].question, self.questions[0])
+        self.assertEqual(answers[0].answer, 'Answer 0')
+
+    def test_unknown_question_is_invalid(self):
+        questions = [self.questions[0].pk, 0]
+        serializer = FormEntrySerializer(data=self.get_data(questions))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('question', serializer.errors['answers'][1])
+
+    def test_question_of_invalid_type_is_invalid(self):
+        questions = [self.questions[0].pk, 'foo']
+        serializer = FormEntrySerializer(data=self.get_data(questions))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('question', serializer.errors['answers'][1])
@@ -1,20 +1,24 @@
 """Dynamic forms views and API endpoints."""
 
 from typing import Union
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from rest_framework import mixins, viewsets
 
-from .exports import write_zip, files_zip
-from .models import Form, FormEntry
+from core.conditional import ConditionalGetMixin
+
+from .exports import iter_files_zip, iter_forms_zip
+from .models import File, Form, FormEntry, Question, Section
 from .serializers import (FormDetailSerializer, FormEntrySerializer,
                           FormSerializer)
 
 
-class FormViewSet(viewsets.ReadOnlyModelViewSet):
+class FormViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """List and retrieve forms."""
 
     serializer_class = FormSerializer
     queryset = Form.objects.all()
+    # entries appear through the entries count
+    version_models = (Form, Section, Question, File, FormEntry)
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -32,23 +36,26 @@ class FormEntryViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
 def download_multiple_forms_entries(request, forms):
     """Download form entries in a ZIP file containing CSV files.
 
+    The archive is streamed as each CSV file is produced.
+
     Note: this is not a proper Django view as it expects an iterable of
     Form objects (typically a queryset).
     """
-    stream = write_zip(forms=forms, folder='reponses')
-    stream.seek(0)
-    contents = stream.read()
     filename = 'responses.zip'
 
-    response = HttpResponse(contents,
-                            content_type='application/x-zip-compressed')
+    response = StreamingHttpResponse(
+        iter_forms_zip(forms=forms, folder='reponses'),
+        content_type='application/x-zip-compressed')
     response['Content-Disposition'] = f'attachment; filename={filename}'
 
     return response
 
 
 def download_files_zip(request, form: Union[Form, None], folder: str):
-    """Download form files in a ZIP archive."""
+    """Download form files in a ZIP archive.
+
+    The archive is streamed as each file is read from the storage.
+    """
     if form:
         files_qs = form.files.all()
         files = (f.file for f in files_qs)
@@ -56,10 +63,8 @@ def download_files_zip(request, form: Union[Form, None], folder: str):
         files = ()
     filename = f'{folder}_files.zip'
 
-    stream = files_zip(files, folder=folder)
-
-    response = HttpResponse(content_type='application/zip')
+    response = StreamingHttpResponse(iter_files_zip(files, folder=folder),
+                                     content_type='application/zip')
     response['Content-Disposition'] = f'attachment; filename={filename}'
-    response.write(stream.read())
 
     return response
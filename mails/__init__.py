@@ -1,2 +1,2 @@
 from .settings import *
-from .notifications import Notification
+from .notifications import Notification, batch, send_batch
@@ -0,0 +1,15 @@
+"""Mails admin panels."""
+
+from django.contrib import admin
+
+from .models import QueuedMail
+
+
+@admin.register(QueuedMail)
+class QueuedMailAdmin(admin.ModelAdmin):
+    """Admin panel for the outbox."""
+
+    list_display = ('subject', 'status', 'attempts', 'created', 'sent',)
+    list_filter = ('status', 'created',)
+    search_fields = ('subject', 'recipients',)
+    readonly_fields = ('created', 'sent', 'last_error',)
@@ -0,0 +1,56 @@
+"""Deliver queued notification emails."""
+
+import logging
+import time
+
+from django.core.management import BaseCommand
+
+from mails.outbox import deliver_queued
+
+logger = logging.getLogger('web.notifications')
+
+
+class Command(BaseCommand):
+    """Deliver the emails waiting in the outbox."""
+
+    help = 'Deliver queued notification emails.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, dest='batch_size',
+            help='Number of emails delivered per batch.')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting once empty.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait when the outbox is empty (with --loop).')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            try:
+                sent, failed = deliver_queued(
+                    batch_size=options['batch_size'])
+            except Exception as e:
+                # Keep the worker alive (e.g. if the database is
+                # temporarily unreachable).
+                if not options['loop']:
+                    raise
+                logger.exception(e)
+                time.sleep(options['interval'])
+                continue
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_sent} queued email(s) delivered.'))
+        if total_failed:
+            self.stderr.write(
+                f'{total_failed} delivery attempt(s) failed '
+                '(see above for logs).')
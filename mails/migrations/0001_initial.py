@@ -0,0 +1,37 @@
+# Generated by Django 2.2 on 2026-10-18 11:54
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedMail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=200, verbose_name='objet')),
+                ('message', models.TextField(verbose_name='message')),
+                ('html_message', models.TextField(blank=True, default='', verbose_name='message HTML')),
+                ('mail_from', models.EmailField(max_length=254, verbose_name='expéditeur')),
+                ('recipients', models.TextField(help_text='Une adresse email par ligne.', verbose_name='destinataires')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('sent', 'Envoyé'), ('failed', 'Échec')], db_index=True, default='pending', max_length=10, verbose_name='état')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name="tentatives d'envoi")),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='créé le')),
+                ('next_attempt', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='prochaine tentative le')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='envoyé le')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='dernière erreur')),
+            ],
+            options={
+                'verbose_name': 'email en attente',
+                'verbose_name_plural': "boîte d'envoi",
+                'ordering': ('created',),
+            },
+        ),
+    ]
@@ -0,0 +1,101 @@
+"""Mails models."""
+
+from datetime import timedelta
+from typing import List
+
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedMailQuerySet(models.QuerySet):
+    """Custom QuerySet for queued mails."""
+
+    def pending(self):
+        """Return mails that still have to be delivered."""
+        return self.filter(status=QueuedMail.STATUS_PENDING)
+
+    def due(self):
+        """Return pending mails whose next delivery attempt is due."""
+        return self.pending().filter(next_attempt__lte=timezone.now())
+
+
+class QueuedMail(models.Model):
+    """Represents an email waiting in the outbox to be delivered.
+
+    Mails are delivered by the `sendqueuedmails` management command.
+    """
+
+    objects = QueuedMailQuerySet.as_manager()
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    _STATUS_CHOICES = (
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_SENT, 'Envoyé'),
+        (STATUS_FAILED, 'Échec'),
+    )
+
+    subject = models.CharField('objet', max_length=200)
+
+    message = models.TextField('message')
+
+    html_message = models.TextField('message HTML', blank=True, default='')
+
+    mail_from = models.EmailField('expéditeur')
+
+    recipients = models.TextField(
+        'destinataires',
+        help_text='Une adresse email par ligne.')
+
+    status = models.CharField(
+        'état', max_length=10, choices=_STATUS_CHOICES,
+        default=STATUS_PENDING, db_index=True)
+
+    attempts = models.PositiveIntegerField(
+        "tentatives d'envoi", default=0)
+
+    created = models.DateTimeField('créé le', auto_now_add=True)
+
+    next_attempt = models.DateTimeField(
+        'prochaine tentative le', default=timezone.now, db_index=True)
+
+    sent = models.DateTimeField('envoyé le', null=True, blank=True)
+
+    last_error = models.TextField('dernière erreur', blank=True, default='')
+
+    class Meta:  # noqa
+        ordering = ('created',)
+        verbose_name = 'email en attente'
+        verbose_name_plural = "boîte d'envoi"
+
+    @property
+    def recipient_list(self) -> List[str]:
+        """Return the list of recipients."""
+        return self.recipients.splitlines()
+
+    def mark_sent(self):
+        """Record a successful delivery."""
+        self.attempts += 1
+        self.status = self.STATUS_SENT
+        self.sent = timezone.now()
+        self.last_error = ''
+
+    def mark_failed(self, error: Exception, max_attempts: int,
+                    retry_delay: int):
+        """Record a failed delivery and schedule the next attempt.
+
+        The delay before the next attempt doubles after each failure.
+        After `max_attempts` attempts, the mail is given up on.
+        """
+        self.attempts += 1
+        self.last_error = repr(error)
+        if self.attempts >= max_attempts:
+            self.status = self.STATUS_FAILED
+        else:
+            delay = retry_delay * 2 ** (self.attempts - 1)
+            self.next_attempt = timezone.now() + timedelta(seconds=delay)
+
+    def __str__(self):
+        return f'{self.subject} ({self.get_status_display()})'
@@ -1,27 +1,102 @@
 """Generic notification functionalities."""
 
-import os
-from typing import List
+import threading
+from contextlib import contextmanager
+from typing import Iterable, List
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.core.mail import (EmailMultiAlternatives, get_connection,
+                              send_mail)
+from django.db import transaction
 from django.utils import timezone
 from django.utils.html import strip_tags
 from django.utils.text import Truncator
 from django.utils import translation
 
-from markdown import markdown
-
+from . import rendering
 from .signals import app_disabled, delivered, notification_sent, failed
 
 
+_local = threading.local()
+
+
+def _get_batch() -> list:
+    return getattr(_local, 'batch', None)
+
+
+@contextmanager
+def batch():
+    """Group the notification emails sent within the block.
+
+    Emails are delivered through a single connection to the email backend
+    (or queued at once if the outbox is enabled), instead of one
+    connection per email. They are delivered when the block exits, once
+    the current transaction (if any) is committed. If the block raises an
+    exception or the transaction is rolled back, they are discarded.
+
+    Nested blocks are merged into the outermost one.
+
+    Example
+    -------
+    with batch():
+        for participation in participations:
+            Accepted(participation=participation).send()
+    """
+    if _get_batch() is not None:
+        yield
+        return
+    _local.batch = messages = []
+    try:
+        yield
+    finally:
+        _local.batch = None
+    # Only reached if the block did not raise.
+    transaction.on_commit(lambda: _send_messages(messages))
+
+
+def send_batch(notifications: Iterable['Notification']):
+    """Send notifications through a single connection."""
+    with batch():
+        for notification in notifications:
+            notification.send()
+
+
+def _send_messages(messages: List[EmailMultiAlternatives]):
+    """Deliver or queue a batch of messages."""
+    if not messages:
+        return
+
+    if settings.MAILS_OUTBOX_ENABLED:
+        from .outbox import enqueue_messages
+        enqueue_messages(messages)
+        return
+
+    try:
+        with get_connection() as connection:
+            connection.send_messages(messages)
+    except Exception as e:
+        failed.send(None, exception=e)
+        return
+
+    for message in messages:
+        delivered.send(None, mail_from=message.from_email,
+                       recipient_list=message.to, subject=message.subject)
+
+
 def send_notification(subject, message, recipient_list,
                       html=True, **kwargs) -> bool:
     """Send an email from the configured MAILS_NOTIFICATIONS_ADDRESS.
 
     If MAILS_ENABLED is not True, does nothing.
 
+    If MAILS_OUTBOX_ENABLED is True, the email is stored in the outbox
+    and delivered later by the `sendqueuedmails` command.
+    In that case, `sent` means the email was queued.
+
+    Within a `batch()` block, the email is delivered once the block exits
+    and the transaction commits, and `sent` means the email was added
+    to the batch.
+
     Returns
     -------
     sent : bool
@@ -31,7 +106,8 @@ def send_notification(subject, message, recipient_list,
     mails_disabled :
         If the mails app is not enabled (MAILS_ENABLED is not True).
     mail_delievered :
-        After the mail has been successfully sent.
+        After the mail has been successfully sent (when the outbox
+        is enabled, after it has been delivered by the worker).
 
     """
     if not settings.MAILS_ENABLED:
@@ -45,6 +121,23 @@ def send_notification(subject, message, recipient_list,
 
     mail_from = settings.MAILS_NOTIFICATIONS_ADDRESS
 
+    messages = _get_batch()
+    if messages is not None:
+        email = EmailMultiAlternatives(subject, message, mail_from,
+                                       recipient_list)
+        if html:
+            email.attach_alternative(kwargs['html_message'], 'text/html')
+        messages.append(email)
+        return True
+
+    if settings.MAILS_OUTBOX_ENABLED:
+        # Imported here because models cannot be imported
+        # while the mails app is being loaded.
+        from .outbox import enqueue
+        enqueue(subject, message, mail_from, recipient_list,
+                html_message=kwargs.get('html_message'))
+        return True
+
     try:
         send_mail(subject, message, mail_from, recipient_list, **kwargs)
     except Exception as e:
@@ -143,22 +236,14 @@ class Notification:
 
     def adapt(self, content, template_name):
         """Adapt the content depending on the template's extension."""
-        filename, file_extension = os.path.splitext(template_name)
-        html = False
-        if file_extension == '.md':
-            content = markdown(content)
-            html = True
-        elif file_extension == '.html':
-            html = True
-        return content, html
+        return rendering.adapt(content, template_name)
 
     def render(self) -> str:
         """Render the template and return the notification message body."""
         translation.activate('fr_FR')  # force usage of French
         template = self.get_template()
         context = self.get_context()
-        content = render_to_string(template, context)
-        content, html = self.adapt(content, template)
+        content, html = rendering.render(template, context)
         self.html = html
         return content
 
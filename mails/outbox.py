@@ -0,0 +1,134 @@
+"""Database-backed outbox for notification emails.
+
+When MAILS_OUTBOX_ENABLED is True, notifications are stored as queued
+mails instead of being sent within the request/response cycle.
+The `sendqueuedmails` management command then delivers them in batches.
+"""
+
+import logging
+from datetime import timedelta
+from typing import List, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedMail
+from .signals import delivered
+
+logger = logging.getLogger('web.notifications')
+
+
+def enqueue(subject: str, message: str, mail_from: str,
+            recipient_list: List[str], html_message: str = None
+            ) -> QueuedMail:
+    """Store an email in the outbox."""
+    return QueuedMail.objects.create(
+        subject=subject,
+        message=message,
+        html_message=html_message or '',
+        mail_from=mail_from,
+        recipients='\n'.join(recipient_list))
+
+
+def enqueue_messages(messages: List[EmailMultiAlternatives]):
+    """Store email messages in the outbox with a single query."""
+    mails = []
+    for message in messages:
+        html_message = ''
+        for content, mimetype in getattr(message, 'alternatives', ()):
+            if mimetype == 'text/html':
+                html_message = content
+        mails.append(QueuedMail(
+            subject=message.subject,
+            message=message.body,
+            html_message=html_message,
+            mail_from=message.from_email,
+            recipients='\n'.join(message.to)))
+    QueuedMail.objects.bulk_create(mails)
+
+
+def _build_message(mail: QueuedMail, connection) -> EmailMultiAlternatives:
+    email = EmailMultiAlternatives(
+        mail.subject, mail.message, mail.mail_from, mail.recipient_list,
+        connection=connection)
+    if mail.html_message:
+        email.attach_alternative(mail.html_message, 'text/html')
+    return email
+
+
+def _claim(batch_size: int, lease: int) -> List[QueuedMail]:
+    """Claim a batch of due mails for delivery.
+
+    Mails are locked (where supported by the database) while being claimed
+    so that concurrent workers do not claim the same mail twice. Claimed
+    mails are postponed by `lease` seconds: if the worker dies before
+    recording the outcome of their delivery, they become due again then.
+    """
+    with transaction.atomic():
+        mails = list(
+            QueuedMail.objects.due()
+            .select_for_update(skip_locked=True)
+            .order_by('next_attempt', 'pk')[:batch_size]
+        )
+        QueuedMail.objects.filter(pk__in=[mail.pk for mail in mails]).update(
+            next_attempt=timezone.now() + timedelta(seconds=lease))
+    return mails
+
+
+def deliver_queued(batch_size: int = None) -> Tuple[int, int]:
+    """Deliver a batch of due queued mails.
+
+    Mails of the batch are claimed in a short transaction, then sent
+    outside of it through a single connection to the email backend. The
+    outcome of each delivery is recorded as soon as it is known.
+
+    Returns
+    -------
+    sent, failed : tuple of int
+        Number of mails delivered and number of failed attempts.
+    """
+    if batch_size is None:
+        batch_size = settings.MAILS_OUTBOX_BATCH_SIZE
+    max_attempts = settings.MAILS_OUTBOX_MAX_ATTEMPTS
+    retry_delay = settings.MAILS_OUTBOX_RETRY_DELAY
+
+    sent = failed = 0
+
+    mails = _claim(batch_size, lease=settings.MAILS_OUTBOX_LEASE)
+    if not mails:
+        return sent, failed
+
+    def record_failure(mail: QueuedMail, error: Exception):
+        nonlocal failed
+        mail.mark_failed(error, max_attempts=max_attempts,
+                         retry_delay=retry_delay)
+        mail.save()
+        failed += 1
+
+    remaining = list(mails)
+    try:
+        with get_connection() as connection:
+            while remaining:
+                mail = remaining.pop(0)
+                try:
+                    _build_message(mail, connection).send()
+                except Exception as e:
+                    logger.exception(e)
+                    record_failure(mail, e)
+                else:
+                    mail.mark_sent()
+                    mail.save()
+                    sent += 1
+                    delivered.send(None, mail_from=mail.mail_from,
+                                   recipient_list=mail.recipient_list,
+                                   subject=mail.subject)
+    except Exception as e:
+        # The connection to the email backend could not be opened
+        # (or closed): mails not sent yet count as a failed attempt.
+        logger.exception(e)
+        for mail in remaining:
+            record_failure(mail, e)
+
+    return sent, failed
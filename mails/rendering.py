@@ -0,0 +1,81 @@
+"""Notification rendering pipeline.
+
+Loaded templates and the Markdown converter are reused across
+notifications. Bodies are rendered for each notification: templates may
+access any data related to the context, which cannot be compared cheaply.
+"""
+
+import os
+import threading
+from typing import Tuple
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template as load_template
+
+from markdown import Markdown
+
+_local = threading.local()
+_templates = {}
+
+
+def get_template(template_name: str):
+    """Return the loaded template, loading it only once per process."""
+    try:
+        return _templates[template_name]
+    except KeyError:
+        template = load_template(template_name)
+        _templates[template_name] = template
+        return template
+
+
+def markdown(text: str) -> str:
+    """Convert Markdown text to HTML.
+
+    A single `Markdown` instance is configured per thread
+    (instances are stateful and not thread-safe) and reset between
+    conversions.
+    """
+    md = getattr(_local, 'markdown', None)
+    if md is None:
+        md = _local.markdown = Markdown()
+    return md.reset().convert(text)
+
+
+def adapt(content: str, template_name: str) -> Tuple[str, bool]:
+    """Adapt the content depending on the template's extension.
+
+    Returns
+    -------
+    content : str
+    html : bool
+        Whether the content is HTML.
+    """
+    extension = os.path.splitext(template_name)[1]
+    if extension == '.md':
+        return markdown(content), True
+    return content, extension == '.html'
+
+
+def render(template_name: str, context: dict) -> Tuple[str, bool]:
+    """Render a notification template.
+
+    Returns
+    -------
+    content : str
+    html : bool
+        Whether the content is HTML.
+    """
+    content = get_template(template_name).render(context)
+    return adapt(content, template_name)
+
+
+def clear_cache():
+    """Clear loaded templates."""
+    _templates.clear()
+
+
+@receiver(setting_changed)
+def _clear_cache_on_setting_changed(setting, **kwargs):
+    if setting == 'TEMPLATES':
+        clear_cache()
@@ -4,3 +4,8 @@ from django.conf import settings
 NOTIFICATIONS_ADDRESS = getattr(settings, 'MAILS_NOTIFICATIONS_ADDRESS')
 ENABLED = getattr(settings, 'MAILS_ENABLED')
 RAISE_EXCEPTIONS = getattr(settings, 'MAILS_RAISE_EXCEPTIONS')
+OUTBOX_ENABLED = getattr(settings, 'MAILS_OUTBOX_ENABLED')
+OUTBOX_BATCH_SIZE = getattr(settings, 'MAILS_OUTBOX_BATCH_SIZE')
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'MAILS_OUTBOX_MAX_ATTEMPTS')
+OUTBOX_RETRY_DELAY = getattr(settings, 'MAILS_OUTBOX_RETRY_DELAY')
+OUTBOX_LEASE = getattr(settings, 'MAILS_OUTBOX_LEASE')
@@ -1,9 +1,20 @@
 """Test the mails app."""
 
-from django.test import TestCase, override_settings
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
 from tests.utils.mixins import SignalTestMixin
-from mails.notifications import Notification
+from mails import rendering
+from mails.models import QueuedMail
+from mails.notifications import Notification, batch, send_batch
+from mails.outbox import deliver_queued
 from mails.signals import delivered, app_disabled, notification_sent
+from users.models import User
 
 
 class TestNotification(Notification):
@@ -11,6 +22,7 @@ class TestNotification(Notification):
 
     subject = 'Test'
     recipient_list = []
+    recipients = ['john.doe@example.com']
 
     def render(self):
         """Do not render a template, simply return a fake body."""
@@ -53,3 +65,260 @@ class SignalsTest(SignalTestMixin, TestCase):
     def test_notification_sent_called(self):
         with self.assertCalled(notification_sent, sender=TestNotification):
             self.notification.send()
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Email backend which fails to send any message."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('Cannot reach the email service')
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    """Email backend which cannot open a connection."""
+
+    def open(self):
+        raise ConnectionError('Cannot reach the email service')
+
+    def send_messages(self, email_messages):
+        self.open()
+
+
+class FlakyEmailBackend(BaseEmailBackend):
+    """Email backend which fails to send every other message."""
+
+    calls = 0
+
+    def send_messages(self, email_messages):
+        type(self).calls += 1
+        if type(self).calls % 2 == 0:
+            raise ConnectionError('Cannot reach the email service')
+        mail.outbox.extend(email_messages)
+        return len(email_messages)
+
+
+@override_settings(MAILS_ENABLED=True, MAILS_OUTBOX_ENABLED=True,
+                   MAILS_OUTBOX_MAX_ATTEMPTS=3, MAILS_OUTBOX_RETRY_DELAY=60)
+class OutboxTest(SignalTestMixin, TestCase):
+    """Test the notifications outbox."""
+
+    def setUp(self):
+        self.notification = TestNotification()
+
+    def test_send_enqueues(self):
+        self.notification.send()
+        self.assertTrue(self.notification.sent)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = QueuedMail.objects.get()
+        self.assertEqual(queued.status, QueuedMail.STATUS_PENDING)
+        self.assertEqual(queued.recipient_list, ['john.doe@example.com'])
+        self.assertEqual(queued.subject, '[OSER] Test')
+
+    def test_deliver_queued(self):
+        self.notification.send()
+        with self.assertCalled(delivered):
+            sent, failed = deliver_queued()
+        self.assertEqual((sent, failed), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['john.doe@example.com'])
+        queued = QueuedMail.objects.get()
+        self.assertEqual(queued.status, QueuedMail.STATUS_SENT)
+        self.assertIsNotNone(queued.sent)
+        # Delivered mails are not delivered again
+        self.assertEqual(deliver_queued(), (0, 0))
+
+    def test_deliver_queued_by_batches(self):
+        for _ in range(5):
+            TestNotification().send()
+        self.assertEqual(deliver_queued(batch_size=2), (2, 0))
+        self.assertEqual(QueuedMail.objects.pending().count(), 3)
+
+    @override_settings(
+        EMAIL_BACKEND='mails.tests.FailingEmailBackend')
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.notification.send()
+        self.assertEqual(deliver_queued(), (0, 1))
+        queued = QueuedMail.objects.get()
+        self.assertEqual(queued.status, QueuedMail.STATUS_PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn('ConnectionError', queued.last_error)
+        self.assertGreater(queued.next_attempt, timezone.now())
+        # Not due yet
+        self.assertEqual(deliver_queued(), (0, 0))
+        first_delay = queued.next_attempt - timezone.now()
+        QueuedMail.objects.update(next_attempt=timezone.now())
+        deliver_queued()
+        queued.refresh_from_db()
+        self.assertGreater(queued.next_attempt - timezone.now(),
+                           first_delay)
+
+    @override_settings(
+        EMAIL_BACKEND='mails.tests.FailingEmailBackend')
+    def test_delivery_given_up_after_max_attempts(self):
+        self.notification.send()
+        for _ in range(3):
+            QueuedMail.objects.update(next_attempt=timezone.now())
+            deliver_queued()
+        queued = QueuedMail.objects.get()
+        self.assertEqual(queued.status, QueuedMail.STATUS_FAILED)
+        self.assertEqual(queued.attempts, 3)
+
+    @override_settings(
+        EMAIL_BACKEND='mails.tests.UnreachableEmailBackend')
+    def test_connection_error_is_recorded(self):
+        for _ in range(2):
+            TestNotification().send()
+        self.assertEqual(deliver_queued(), (0, 2))
+        for queued in QueuedMail.objects.all():
+            self.assertEqual(queued.attempts, 1)
+            self.assertIn('ConnectionError', queued.last_error)
+
+    @override_settings(EMAIL_BACKEND='mails.tests.FlakyEmailBackend')
+    def test_outcome_is_recorded_per_mail(self):
+        FlakyEmailBackend.calls = 0
+        for _ in range(2):
+            TestNotification().send()
+        self.assertEqual(deliver_queued(), (1, 1))
+        first, second = QueuedMail.objects.order_by('pk')
+        self.assertEqual(first.status, QueuedMail.STATUS_SENT)
+        self.assertEqual(second.status, QueuedMail.STATUS_PENDING)
+        self.assertEqual(second.attempts, 1)
+
+    @override_settings(MAILS_OUTBOX_LEASE=60)
+    def test_claimed_mails_are_not_delivered_twice(self):
+        self.notification.send()
+        # Claimed by a worker which died before sending
+        with patch('mails.outbox.get_connection',
+                   side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                deliver_queued()
+        self.assertEqual(deliver_queued(), (0, 0))
+        # Delivered once the lease has expired
+        QueuedMail.objects.update(next_attempt=timezone.now())
+        self.assertEqual(deliver_queued(), (1, 0))
+
+    def test_command_delivers_all_queued_mails(self):
+        for _ in range(3):
+            TestNotification().send()
+        call_command('sendqueuedmails', batch_size=2, verbosity=0)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(QueuedMail.objects.pending().exists())
+
+
+class CountingEmailBackend(BaseEmailBackend):
+    """Email backend which counts opened connections."""
+
+    connections = 0
+    sent = []
+
+    def open(self):
+        type(self).connections += 1
+        return True
+
+    def send_messages(self, email_messages):
+        type(self).sent.extend(email_messages)
+        return len(email_messages)
+
+
+@override_settings(MAILS_ENABLED=True, MAILS_OUTBOX_ENABLED=False,
+                   EMAIL_BACKEND='mails.tests.CountingEmailBackend')
+class BatchTest(SignalTestMixin, TransactionTestCase):
+    """Test sending notifications in batches."""
+
+    def setUp(self):
+        CountingEmailBackend.connections = 0
+        CountingEmailBackend.sent = []
+
+    def test_batch_uses_single_connection(self):
+        with batch():
+            for _ in range(10):
+                TestNotification().send()
+            self.assertEqual(CountingEmailBackend.sent, [])
+        self.assertEqual(CountingEmailBackend.connections, 1)
+        self.assertEqual(len(CountingEmailBackend.sent), 10)
+
+    def test_send_batch(self):
+        notifications = [TestNotification() for _ in range(3)]
+        with self.assertCalled(delivered):
+            send_batch(notifications)
+        self.assertTrue(all(n.sent for n in notifications))
+        self.assertEqual(CountingEmailBackend.connections, 1)
+        self.assertEqual(len(CountingEmailBackend.sent), 3)
+
+    def test_nested_batches_are_merged(self):
+        with batch():
+            TestNotification().send()
+            with batch():
+                TestNotification().send()
+            self.assertEqual(CountingEmailBackend.sent, [])
+        self.assertEqual(CountingEmailBackend.connections, 1)
+        self.assertEqual(len(CountingEmailBackend.sent), 2)
+
+    def test_batch_is_discarded_on_exception(self):
+        with self.assertRaises(ValueError):
+            with batch():
+                TestNotification().send()
+                raise ValueError
+        self.assertEqual(CountingEmailBackend.sent, [])
+
+    def test_batch_is_sent_on_commit(self):
+        with transaction.atomic():
+            with batch():
+                TestNotification().send()
+            self.assertEqual(CountingEmailBackend.sent, [])
+        self.assertEqual(len(CountingEmailBackend.sent), 1)
+
+    def test_batch_is_discarded_on_rollback(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                with batch():
+                    TestNotification().send()
+                raise ValueError
+        self.assertEqual(CountingEmailBackend.sent, [])
+
+    @override_settings(MAILS_OUTBOX_ENABLED=True)
+    def test_batch_is_queued_with_outbox(self):
+        send_batch(TestNotification() for _ in range(3))
+        self.assertEqual(CountingEmailBackend.sent, [])
+        self.assertEqual(QueuedMail.objects.pending().count(), 3)
+
+
+class ExampleNotification(Notification):
+    """A notification rendered from a Markdown template."""
+
+    args = ('user', 'date',)
+    template_name = 'myapp/today.md'
+    subject = 'Example'
+
+
+class RenderingTest(TestCase):
+    """Test the notification rendering pipeline."""
+
+    def setUp(self):
+        rendering.clear_cache()
+        self.user = User(first_name='John', email='john.doe@example.com')
+        self.date = timezone.now()
+
+    def render(self, **kwargs):
+        kwargs.setdefault('user', self.user)
+        kwargs.setdefault('date', self.date)
+        return ExampleNotification(**kwargs).render()
+
+    def test_template_is_loaded_once(self):
+        with patch('mails.rendering.load_template',
+                   wraps=rendering.load_template) as load:
+            for _ in range(10):
+                self.render()
+        self.assertEqual(load.call_count, 1)
+
+    def test_changed_data_is_rendered(self):
+        first = self.render()
+        self.user.first_name = 'Jane'
+        second = self.render()
+        self.assertIn('John', first)
+        self.assertIn('Jane', second)
+
+    def test_html_flag_is_set(self):
+        notification = ExampleNotification(user=self.user, date=self.date)
+        notification.render()
+        self.assertTrue(notification.html)
@@ -123,10 +123,13 @@ WSGI_APPLICATION = 'oser_backend.wsgi.application'
 # Django rest framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        # Token authentication, with tokens cached if API_TOKEN_CACHE is set
+        'api.authentication.CachedTokenAuthentication',
         # v Enable session authentication in the browsable API
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # Lists are paginated when a page_size is requested
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CursorPagination',
 }
 
 # Security
@@ -265,6 +268,16 @@ SENDGRID_ECHO_TO_STDOUT = True
 MAILS_ENABLED = True
 MAILS_NOTIFICATIONS_ADDRESS = 'notifications@oser-cs.fr'
 MAILS_RAISE_EXCEPTIONS = False
+# Queue notifications in the database instead of sending them right away.
+# Queued mails are delivered by: python manage.py sendqueuedmails --loop
+MAILS_OUTBOX_ENABLED = False
+MAILS_OUTBOX_BATCH_SIZE = 50
+MAILS_OUTBOX_MAX_ATTEMPTS = 5
+# Delay before retrying a failed delivery (seconds), doubled after each try
+MAILS_OUTBOX_RETRY_DELAY = 60
+# Delay after which mails claimed by a worker which did not record their
+# delivery (e.g. because it crashed) are delivered again (seconds)
+MAILS_OUTBOX_LEASE = 300
 
 # Visits app config
 VISITS_TEAM_EMAIL = os.environ.get('VISITS_TEAM_EMAIL',
@@ -28,6 +28,9 @@ SECURE_BROWSER_XSS_FILTER = True
 # Mails
 MAILS_ENABLED = True
 MAILS_RAISE_EXCEPTIONS = os.environ.get('MAILS_RAISE_EXCEPTIONS', False)
+# Requires the worker process (see Procfile) to be running
+MAILS_OUTBOX_ENABLED = (
+    os.environ.get('MAILS_OUTBOX_ENABLED', '').lower() in ('1', 'true'))
 
 # SendGrid
 # Allow Sandbox if DEBUG is True (we're in prod anyway)
@@ -0,0 +1,87 @@
+"""Deferred side effects of student profile updates.
+
+When a student fills in their personal data, they are sent the
+registration documents by email, and the secretariat is notified on
+Telegram. Both are slow calls to external APIs, so they are run once the
+transaction saving the student has committed, in a background thread.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .notifications import SendDocs
+from .settings import settings
+
+logger = logging.getLogger('web.profiles.dispatch')
+
+TELEGRAM_MESSAGE = (
+    "Un tutoré a renseigné ses données personnelles, "
+    "il attend ta validation !"
+)
+
+_executor = ThreadPoolExecutor(max_workers=1)
+_bot = None
+_bot_lock = threading.Lock()
+
+
+def get_telegram_bot():
+    """Return the Telegram bot shared by the process.
+
+    Returns None if no bot token is configured.
+    """
+    global _bot
+    token = settings.TELEGRAM['bot_token']
+    if token is None:
+        return None
+    with _bot_lock:
+        if _bot is None or _bot.token != token:
+            _bot = telegram.Bot(token=token)
+        return _bot
+
+
+def _notify(user):
+    """Send the registration docs and notify the Telegram channel."""
+    SendDocs(user=user).send()
+
+    bot = get_telegram_bot()
+    if bot is not None:
+        channel = settings.TELEGRAM['channel_name']
+        bot.send_message(chat_id=f'@{channel}', text=TELEGRAM_MESSAGE,
+                         parse_mode=telegram.ParseMode.HTML)
+
+
+def _notify_in_background(user):
+    try:
+        _notify(user)
+    except Exception as e:
+        logger.exception(e)
+    finally:
+        # Do not leave this thread's database connection open.
+        connection.close()
+
+
+def _dispatch(student_pk: int, user):
+    # Repeated saves of the same student (in the same transaction or
+    # within the debounce delay) only notify once.
+    key = f'profiles:student-updated:{student_pk}'
+    if not cache.add(key, True, settings.PROFILES_NOTIFY_DEBOUNCE):
+        return
+    if settings.PROFILES_DISPATCH_ASYNC:
+        _executor.submit(_notify_in_background, user)
+    else:
+        _notify(user)
+
+
+def student_updated(student):
+    """Notify that a student filled in their personal data.
+
+    Notifications are sent after the current transaction commits,
+    and not at all if it is rolled back.
+    """
+    student_pk, user = student.pk, student.user
+    transaction.on_commit(lambda: _dispatch(student_pk, user))
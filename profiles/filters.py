@@ -0,0 +1,60 @@
+"""Profiles admin filters."""
+
+from typing import List
+
+from django.contrib import admin
+from django.core.cache import cache
+
+from .models import Student
+from .settings import settings
+
+SCHOOLS_CACHE_KEY = 'profiles:schools'
+
+
+def get_schools() -> List[str]:
+    """Return the sorted list of the students' schools.
+
+    The list is cached, and invalidated when a student is saved
+    or deleted.
+    """
+    schools = cache.get(SCHOOLS_CACHE_KEY)
+    if schools is None:
+        schools = list(
+            Student.objects
+            .exclude(school__isnull=True)
+            .exclude(school='')
+            .order_by('school')
+            .values_list('school', flat=True)
+            .distinct()
+        )
+        cache.set(SCHOOLS_CACHE_KEY, schools,
+                  settings.PROFILES_SCHOOLS_CACHE_TIMEOUT)
+    return schools
+
+
+def invalidate_schools():
+    """Clear the cached list of schools."""
+    cache.delete(SCHOOLS_CACHE_KEY)
+
+
+class SchoolFilter(admin.SimpleListFilter):
+    """Filter objects by the school of their student.
+
+    Class attributes
+    ----------------
+    school_field : str
+        Lookup path from the filtered model to the student's school.
+        Defaults to `user__student__school`, which joins through the
+        user's ID.
+    """
+
+    title = 'établissement'
+    parameter_name = 'profiles__school'
+    school_field = 'user__student__school'
+
+    def lookups(self, request, model_admin):
+        return [(school, school) for school in get_schools()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.school_field: self.value()})
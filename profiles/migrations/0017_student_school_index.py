@@ -0,0 +1,18 @@
+# Generated by Django 2.2 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0016_auto_20211225_1242'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='school',
+            field=models.CharField(blank=True, db_index=True, max_length=70, null=True, verbose_name='établissement'),
+        ),
+    ]
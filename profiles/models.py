@@ -5,11 +5,7 @@ from django.shortcuts import reverse
 from dry_rest_permissions.generics import authenticated_users
 from .utils import get_promotion_range
 from datetime import datetime
-from .notifications import SendDocs
-
-import telegram
-from django.conf import settings
-from django.template.loader import render_to_string
+from . import dispatch
 
 
 class ProfileMixin:
@@ -129,6 +125,7 @@ class Student(ProfileMixin, models.Model):
     school = models.CharField(max_length=70,
                               null=True,
                               blank=True,
+                              db_index=True,
                               verbose_name="établissement"
                               )
 
@@ -183,25 +180,20 @@ class Student(ProfileMixin, models.Model):
 
     def save(self, *args, **kwargs):
         """Updates the year field based on the last modified date"""
-        if self.city != None:  # Ne mettre à jour que quand les données personnelles sont remplies
+        personal_data_filled = self.city != None  # Ne mettre à jour que quand les données personnelles sont remplies
+        if personal_data_filled:
             date_now = datetime.now()
             if date_now.month >= 9:
                 self.year = f"{date_now.year}/{date_now.year+1}"
             else:
                 self.year = f"{date_now.year-1}/{date_now.year}"
 
-            # send email with link to registration docs
-            SendDocs(user=self.user).send()
-
-            # send a telegram message to oserSECGEN
-            telegram_settings = settings.TELEGRAM
-            if telegram_settings['bot_token'] != None:
-                message_telegram = "Un tutoré a renseigné ses données personnelles, il attend ta validation !"
-                bot = telegram.Bot(token=telegram_settings['bot_token'])
-                bot.send_message(
-                    chat_id="@%s" % telegram_settings['channel_name'], text=message_telegram, parse_mode=telegram.ParseMode.HTML)
+        super(Student, self).save(*args, **kwargs)
 
-        return super(Student, self).save(*args, **kwargs)
+        if personal_data_filled:
+            # send email with link to registration docs and a telegram
+            # message to oserSECGEN, once the student is saved
+            dispatch.student_updated(self)
 
     class Meta:  # noqa
         verbose_name = 'lycéen'
@@ -8,3 +8,13 @@ from utils import setdefault
 setdefault(settings, 'NUMBER_OF_PROMOTIONS', 5)
 setdefault(settings, 'NEW_PROMOTION_ARRIVAL_MONTH', 9)
 setdefault(settings, 'NEW_PROMOTION_ARRIVAL_DAY', 1)
+
+# Student profile updates notifications
+# Run notifications in a background thread
+setdefault(settings, 'PROFILES_DISPATCH_ASYNC', True)
+# Seconds during which repeated saves of a student only notify once
+setdefault(settings, 'PROFILES_NOTIFY_DEBOUNCE', 300)
+
+# Seconds during which the list of schools of the admin filters is cached
+# (it is also invalidated when a student is saved)
+setdefault(settings, 'PROFILES_SCHOOLS_CACHE_TIMEOUT', 3600)
@@ -1,8 +1,9 @@
 """Profile signals."""
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Tutor
+from .filters import invalidate_schools
+from .models import Student, Tutor
 
 
 @receiver(post_save, sender=Tutor)
@@ -16,3 +17,10 @@ def add_created_tutor_to_staff(sender, instance, created, **kwargs):
     if created:
         instance.user.is_staff = True
         instance.user.save()
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_schools_on_student_change(sender, **kwargs):
+    """Refresh the list of schools of the admin filters."""
+    invalidate_schools()
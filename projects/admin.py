@@ -1,16 +1,16 @@
 """Projects admin configuration."""
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Count, Max, Q
+from django.template.defaultfilters import pluralize
 
+from core.admin import ExportMixin
+from core.exports import PARTICIPANT_COLUMNS, Column, model_columns
 from dynamicforms.views import download_multiple_forms_entries
 from dynamicforms.models import Form
 from .models import Edition, Participation, Project, EditionForm
 from django.contrib.admin import SimpleListFilter
-from profiles.models import Student
-from django.http import HttpResponse
-import csv
-from users.models import User
-import codecs
+from profiles.filters import SchoolFilter
 
 
 
@@ -21,20 +21,33 @@ class ProjectAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'logo', 'num_editions', 'last_edition',
                     'total_accepted_participations')
 
+    def get_queryset(self, request):
+        """Compute the edition counters of all projects in one query."""
+        accepted = Q(editions__participations__state=(
+            Participation.STATE_ACCEPTED))
+        return super().get_queryset(request).annotate(
+            num_editions=Count('editions', distinct=True),
+            last_edition_year=Max('editions__year'),
+            num_accepted=Count('editions__participations', filter=accepted),
+        )
+
     def num_editions(self, obj: Project) -> int:
         """Return the number of editions."""
-        return obj.editions.count()
+        return obj.num_editions
     num_editions.short_description = "Éditions"
+    num_editions.admin_order_field = 'num_editions'
 
     def last_edition(self, obj: Project) -> int:
         """Return the year of the last edition."""
-        return obj.editions.latest().year
+        return obj.last_edition_year
     last_edition.short_description = 'Année de la dernière édition'
+    last_edition.admin_order_field = 'last_edition_year'
 
     def total_accepted_participations(self, obj: Project) -> int:
         """Return total number of accepted participations."""
-        return obj.total_participations(state=Participation.STATE_ACCEPTED)
+        return obj.num_accepted
     total_accepted_participations.short_description = 'Participations totales'
+    total_accepted_participations.admin_order_field = 'num_accepted'
 
 
 class OrganizersInline(admin.TabularInline):
@@ -44,25 +57,6 @@ class OrganizersInline(admin.TabularInline):
     extra = 0
 
 
-class SchoolFilter(admin.SimpleListFilter):
-    title = 'établissement'
-    parameter_name = 'profiles__school'
-
-    def lookups(self, request, model_admin):
-        list_of_school = []
-        query = Student.objects.values_list(
-            "school", flat=True).distinct()
-        for school in query:
-            list_of_school.append((school, school))
-        return list_of_school
-
-    def queryset(self, request, queryset):
-        if self.value():
-            emails = Student.objects.filter(
-                school=self.value()).values_list("user__email", flat=True)
-            return queryset.filter(user__email__in=emails)
-
-
 @ admin.register(Edition)
 class EditionAdmin(admin.ModelAdmin):
     """Admin panel for editions."""
@@ -71,32 +65,42 @@ class EditionAdmin(admin.ModelAdmin):
                     'num_pending', 'num_validated', 'num_accepted',
                     'num_rejected', 'num_cancelled')
     list_filter = ('project', 'year',)
+    list_select_related = ('project',)
     inlines = (OrganizersInline,)
 
+    def get_queryset(self, request):
+        """Count the participations of all editions in one query."""
+        return super().get_queryset(request).with_state_counts()
+
     def num_pending(self, obj: Edition) -> int:
         """Return number of pending participations."""
-        return obj.participations.pending().count()
+        return obj.num_pending
     num_pending.short_description = 'En attente'
+    num_pending.admin_order_field = 'num_pending'
 
     def num_validated(self, obj: Edition) -> int:
         """Return number of validated participations."""
-        return obj.participations.validated().count()
+        return obj.num_validated
     num_validated.short_description = 'Validés'
+    num_validated.admin_order_field = 'num_validated'
 
     def num_accepted(self, obj: Edition) -> int:
         """Return number of accepted participations."""
-        return obj.participations.accepted().count()
+        return obj.num_accepted
     num_accepted.short_description = 'Acceptés'
+    num_accepted.admin_order_field = 'num_accepted'
 
     def num_rejected(self, obj: Edition) -> int:
         """Return number of rejected participations."""
-        return obj.participations.rejected().count()
+        return obj.num_rejected
     num_rejected.short_description = 'Refusés'
+    num_rejected.admin_order_field = 'num_rejected'
 
     def num_cancelled(self, obj: Edition) -> int:
         """Return number of cancelled participations."""
-        return obj.participations.cancelled().count()
+        return obj.num_cancelled
     num_cancelled.short_description = 'Annulés'
+    num_cancelled.admin_order_field = 'num_cancelled'
 
 
 @ admin.register(EditionForm)
@@ -107,39 +111,68 @@ class EditionFormAdmin(admin.ModelAdmin):
     list_filter = ('edition', 'deadline',)
 
 
-@ admin.register(Participation)
-class ParticipationAdmin(admin.ModelAdmin):
-    """Participation admin panel."""
+def _edition_display(project: str, year: int, name: str) -> str:
+    """Represent an edition as `Edition.__str__()` does."""
+    s = f'{project} édition {year}'
+    if name:
+        s += f' ({name})'
+    return s
+
 
-    def export_as_csv(self, request, queryset):
-        meta = self.model._meta
-        field_names = [field.name for field in meta.fields]
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename={}.csv'.format(
-            meta)
-        response.write(codecs.BOM_UTF8)  # force response to be UTF-8
-        writer = csv.writer(response, delimiter=';')
+def _entry_display(form: str, submitted) -> str:
+    """Represent a form entry as `FormEntry.__str__()` does."""
+    if form is None:
+        return ''
+    return f'{form} ({submitted})'
 
-        writer.writerow(['first_name', 'last_name', 'school', 'grade',
-                         'phone_number', 'scholarship'] + field_names)
 
-        list_email = queryset.values_list("user__email", flat=True)
-        nb_user = 0
-        for obj in queryset:
+def _set_state_action(state: str, description: str):
+    """Build an admin action moving the selected participations to a state.
 
-            name = User.objects.filter(
-                email=str(list_email[nb_user])).values('first_name', 'last_name', 'phone_number')
-            school = Student.objects.filter(
-                user__email=str(list_email[nb_user])).values('school', 'grade', 'scholarship')
+    See `ParticipationQuerySet.set_state()`.
+    """
+    def set_state(modeladmin, request, queryset):
+        invalid = queryset.invalid_transitions(state).count()
+        if invalid:
+            s = pluralize(invalid)
+            messages.add_message(
+                request, messages.ERROR,
+                f'{invalid} participation{s} annulée{s} ne peu'
+                f'{pluralize(invalid, "t,vent")} être modifiée{s}.')
+            return
+        count = len(queryset.set_state(state))
+        s = pluralize(count)
+        messages.add_message(request, messages.SUCCESS,
+                             f'{count} participation{s} modifiée{s}.')
 
-            row = writer.writerow([name[0]['first_name'], name[0]['last_name'], school[0]['school'], school[0]['grade'], name[0]['phone_number'], school[0]['scholarship']] + [getattr(obj, field)
-                                                                                                                                                                               for field in field_names])
-            nb_user += 1
-        return response
+    set_state.__name__ = f'set_state_{state}'
+    set_state.short_description = description
+    return set_state
 
-    export_as_csv.short_description = "Exporter sélection (en .csv)"
 
-    actions = ["export_as_csv"]
+@ admin.register(Participation)
+class ParticipationAdmin(ExportMixin, admin.ModelAdmin):
+    """Participation admin panel."""
+
+    actions = [
+        _set_state_action(Participation.STATE_VALIDATED,
+                          'Marquer les participations comme validées'),
+        _set_state_action(Participation.STATE_ACCEPTED,
+                          'Accepter les participations sélectionnées'),
+        _set_state_action(Participation.STATE_REJECTED,
+                          'Refuser les participations sélectionnées'),
+        "export_as_csv",
+        "export_as_xlsx",
+    ]
+    export_columns = PARTICIPANT_COLUMNS + tuple(model_columns(
+        Participation,
+        user=('user__email', 'user'),
+        edition=Column('edition__project__name', 'edition__year',
+                       'edition__name', header='edition',
+                       transform=_edition_display),
+        entry=Column('entry__form__title', 'entry__submitted',
+                     header='entry', transform=_entry_display),
+    ))
 
     list_display = ('user', 'edition', 'submitted', 'state')
     list_filter = (SchoolFilter,
@@ -0,0 +1,51 @@
+# Generated by Django 2.2 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+from core.markdown import get_source_hash, render_markdown
+
+MARKDOWN_FIELDS = [('Project', 'description'), ('Edition', 'description')]
+
+
+def render_markdown_html(apps, schema_editor):
+    """Store the HTML rendering of existing Markdown fields."""
+    for model_name, name in MARKDOWN_FIELDS:
+        model = apps.get_model('projects', model_name)
+        for pk, source in model.objects.values_list('pk', name):
+            source = source or ''
+            model.objects.filter(pk=pk).update(**{
+                f'{name}_html': render_markdown(source),
+                f'{name}_hash': get_source_hash(source),
+            })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_auto_20180911_1938'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='edition',
+            name='description_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='edition',
+            name='description_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='description_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='description_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(render_markdown_html,
+                             migrations.RunPython.noop),
+    ]
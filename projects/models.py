@@ -1,16 +1,21 @@
 """Projects models."""
 
-from django.db import models
+from typing import List
+
+from django.db import models, transaction
 from django.contrib.sites.models import Site
 from django.core.validators import ValidationError
+from django.db.models.functions import Coalesce
 
 from markdownx.models import MarkdownxField
 
+from core.models import MarkdownHTMLMixin
+from core.versions import bump_version
 from profiles.models import Tutor
 from .utils import this_year
 
 
-class Project(models.Model):
+class Project(MarkdownHTMLMixin, models.Model):
     """Represents a project that can have multiple editions over the years."""
 
     name = models.CharField(
@@ -21,10 +26,17 @@ class Project(models.Model):
         blank=True, default='',
         help_text='Une description générale du projet')
 
+    description_html = models.TextField(
+        editable=False, blank=True, default='')
+    description_hash = models.CharField(
+        max_length=40, editable=False, blank=True, default='')
+
     logo = models.ImageField(
         null=True, blank=True, upload_to='projects/logos/',
         help_text='Le logo du projet ou une image représentative.')
 
+    markdown_fields = ('description',)
+
     editions: models.Manager
 
     class Meta:  # noqa
@@ -51,9 +63,73 @@ class Project(models.Model):
         return str(self.name)
 
 
-class Edition(models.Model):
+def _count_per_edition(queryset, field='pk'):
+    """Return a subquery counting distinct values of rows per edition.
+
+    Unlike a `Count()` over a join, several of them can be combined
+    without multiplying the joined rows.
+    """
+    counts = (
+        queryset
+        .filter(edition=models.OuterRef('pk'))
+        .order_by()
+        .values('edition')
+        .annotate(count=models.Count(field, distinct=True))
+        .values('count')
+    )
+    return Coalesce(
+        models.Subquery(counts, output_field=models.IntegerField()), 0)
+
+
+class EditionQuerySet(models.QuerySet):
+    """Custom QuerySet for editions."""
+
+    def with_participation_info(self, user=None):
+        """Annotate editions with their organizers and participations.
+
+        Adds the following annotations:
+
+        - `num_organizers`: the number of organizers.
+        - `num_participations`: the number of participations.
+        - `participates`: whether `user` participates in the edition.
+        """
+        user_participations = Participation.objects.filter(
+            edition=models.OuterRef('pk'),
+            user_id=getattr(user, 'pk', None))
+        return self.annotate(
+            num_organizers=_count_per_edition(
+                EditionOrganizer.objects.all(), 'user'),
+            num_participations=_count_per_edition(
+                Participation.objects.all()),
+            participates=models.Exists(user_participations),
+        )
+
+    def with_state_counts(self):
+        """Annotate editions with their number of participations per state.
+
+        Adds a `num_<state>` annotation for each participation state,
+        e.g. `num_pending` or `num_accepted`, using a single grouped query.
+        """
+        states = {
+            'pending': Participation.STATE_PENDING,
+            'validated': Participation.STATE_VALIDATED,
+            'accepted': Participation.STATE_ACCEPTED,
+            'rejected': Participation.STATE_REJECTED,
+            'cancelled': Participation.STATE_CANCELLED,
+        }
+        return self.annotate(**{
+            f'num_{name}': models.Count(
+                'participations',
+                filter=models.Q(participations__state=state))
+            for name, state in states.items()
+        })
+
+
+class Edition(MarkdownHTMLMixin, models.Model):
     """Represents an instance of a project for a given year."""
 
+    objects = EditionQuerySet.as_manager()
+
     year = models.IntegerField(
         'année', default=this_year,
         help_text="L'année où se déroule cette édition.")
@@ -73,9 +149,16 @@ class Edition(models.Model):
             'Une description spécifique pour cette édition.'
         ))
 
+    description_html = models.TextField(
+        editable=False, blank=True, default='')
+    description_hash = models.CharField(
+        max_length=40, editable=False, blank=True, default='')
+
     organizers = models.ManyToManyField(
         'users.User', through='EditionOrganizer')
 
+    markdown_fields = ('description',)
+
     participations: models.Manager
 
     class Meta:  # noqa
@@ -172,6 +255,54 @@ class ParticipationQuerySet(models.QuerySet):
         """Return cancelled participations only."""
         return self.filter(state=Participation.STATE_CANCELLED)
 
+    def invalid_transitions(self, state: str):
+        """Return participations which cannot be moved to `state`.
+
+        A cancelled participation can only be reactivated, i.e. sent back
+        to the pending state.
+        """
+        if state == Participation.STATE_PENDING:
+            return self.none()
+        return self.cancelled().exclude(state=state)
+
+    def set_state(self, state: str) -> List['Participation']:
+        """Change the state of participations in bulk.
+
+        The state is updated with a single UPDATE query, then the state
+        signals are sent for each participation whose state changed, as
+        saving them one by one would. Notifications sent by the receivers
+        are delivered in a batch.
+
+        Transitions are not validated, see `invalid_transitions()`.
+
+        Returns
+        -------
+        changed : list of Participation
+            The participations whose state changed.
+        """
+        # Imported here to avoid circular imports
+        from mails import batch
+        from .signals import send_state_signal
+
+        with transaction.atomic():
+            changed = list(
+                self.exclude(state=state)
+                .select_related('user', 'edition__project')
+                .select_for_update(of=('self',))
+            )
+            Participation.objects.filter(
+                pk__in=[participation.pk for participation in changed]
+            ).update(state=state)
+        bump_version(Participation)
+
+        with batch():
+            for participation in changed:
+                participation.state = state
+                send_state_signal(participation)
+                participation.initial_state = state
+
+        return changed
+
 
 class Participation(models.Model):
     """Represents the participation of a user (a student) to a project."""
@@ -65,18 +65,31 @@ class EditionListSerializer(serializers.HyperlinkedModelSerializer):
 
     def get_organizers(self, obj: Edition) -> int:
         """Return the number of organizers."""
-        return obj.organizers.count()
+        count = getattr(obj, 'num_organizers', None)
+        if count is None:
+            count = obj.organizers.count()
+        return count
 
     def get_participations(self, obj: Edition) -> int:
         """Return the number of participations."""
-        return obj.participations.count()
+        count = getattr(obj, 'num_participations', None)
+        if count is None:
+            count = obj.participations.count()
+        return count
 
     def get_participates(self, obj: Edition) -> bool:
-        """Return whether the current user participates in the edition."""
+        """Return whether the current user participates in the edition.
+
+        Read from the `participates` annotation if present.
+        See `EditionQuerySet.with_participation_info()`.
+        """
+        participates = getattr(obj, 'participates', None)
+        if participates is not None:
+            return participates
         request = self.context['request']
         if not request.user:
             return False
-        return request.user.pk in obj.participations.values_list('user__pk')
+        return obj.participations.filter(user__pk=request.user.pk).exists()
 
     class Meta:  # noqa
         model = Edition
@@ -114,8 +127,6 @@ class ParticipationSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             entry_data = validated_data['entry']
             entry = FormEntrySerializer().create(entry_data)
-            for answer in entry.answers.all():
-                print(answer)
 
             participation = Participation.objects.create(
                 user=validated_data['user'],
@@ -138,6 +149,49 @@ class ParticipationSerializer(serializers.ModelSerializer):
         }
 
 
+class ParticipationStateSerializer(serializers.Serializer):
+    """Serializer for changing the state of participations in bulk."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False,
+        label='Participations',
+        help_text='Identifiers of the participations to update.')
+
+    state = serializers.ChoiceField(
+        choices=Participation._STATE_CHOICES,
+        label='État',
+        help_text='State the participations should be moved to.')
+
+    def validate(self, data: dict) -> dict:
+        """Check that all participations exist and can change state."""
+        ids = set(data['ids'])
+        state = data['state']
+        participations = Participation.objects.filter(pk__in=ids)
+
+        missing = ids - set(participations.values_list('pk', flat=True))
+        if missing:
+            raise serializers.ValidationError({
+                'ids': ('Participations not found: '
+                        f'{", ".join(map(str, sorted(missing)))}')
+            })
+
+        invalid = participations.invalid_transitions(state)
+        invalid_ids = sorted(invalid.values_list('pk', flat=True))
+        if invalid_ids:
+            raise serializers.ValidationError({
+                'ids': (f'Participations cannot be set to {state}: '
+                        f'{", ".join(map(str, invalid_ids))}')
+            })
+
+        data['participations'] = participations
+        return data
+
+    def create(self, validated_data: dict) -> list:
+        """Apply the transition and return the changed participations."""
+        participations = validated_data['participations']
+        return participations.set_state(validated_data['state'])
+
+
 class OrganizerSerializer(serializers.ModelSerializer):
     """Serializer for edition organizers."""
 
@@ -149,7 +203,14 @@ class OrganizerSerializer(serializers.ModelSerializer):
 
 
 class EditionDetailSerializer(EditionListSerializer):
-    """Detail serializer for Edition objects."""
+    """Detail serializer for Edition objects.
+
+    The representation of the edition form's form is cached (see
+    `FormDetailSerializer`). The rest of the representation is not: most
+    of it is user data (organizers, participants, recipient), and users
+    are saved too often (e.g. on each login) for their version to be
+    tracked.
+    """
 
     organizers = OrganizerSerializer(source='editionorganizer_set', many=True)
     participations = ParticipationSerializer(many=True)
@@ -20,6 +20,19 @@ deleted = Signal(providing_args=('instance',))
 deleted_organizers = Signal(providing_args=('instance',))
 
 
+def send_state_signal(instance: Participation):
+    """Send the signal corresponding to the state of a participation."""
+    signals = {
+        Participation.STATE_PENDING: pending,
+        Participation.STATE_VALIDATED: valid,
+        Participation.STATE_ACCEPTED: accepted,
+        Participation.STATE_REJECTED: rejected,
+        Participation.STATE_CANCELLED: cancelled,
+    }
+    if instance.state in signals.keys():
+        signals[instance.state].send(Participation, instance=instance)
+
+
 def _send(cls, instance: Participation):
     cls(user=instance.user, edition=instance.edition).send()
 
@@ -39,15 +52,7 @@ def send_state_notifications(sender, instance: Participation,
     """Send notifications when the state of a participation has changed."""
     if not created and not instance.state_changed:
         return
-    signals = {
-        Participation.STATE_PENDING: pending,
-        Participation.STATE_VALIDATED: valid,
-        Participation.STATE_ACCEPTED: accepted,
-        Participation.STATE_REJECTED: rejected,
-        Participation.STATE_CANCELLED: cancelled,
-    }
-    if instance.state in signals.keys():
-        signals[instance.state].send(Participation, instance=instance)
+    send_state_signal(instance)
 
 
 @receiver(pre_delete, sender=Participation)
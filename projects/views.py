@@ -1,6 +1,7 @@
 """Projects views."""
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
 from django.shortcuts import redirect
 from django.utils.text import slugify
 from django.utils.timezone import now
@@ -9,16 +10,20 @@ from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from core.conditional import ConditionalGetMixin
+from dynamicforms.models import Form
 from dynamicforms.serializers import FormEntrySerializer
 from dynamicforms.views import download_files_zip
 
-from .models import Edition, Participation, Project
+from .models import (Edition, EditionForm, EditionOrganizer, Participation,
+                     Project)
 from .serializers import (EditionDetailSerializer, EditionDocumentsSerializer,
                           EditionListSerializer, ParticipationSerializer,
+                          ParticipationStateSerializer,
                           ProjectDetailSerializer, ProjectSerializer)
 
 
-class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """List and retrieve projects.
 
     list:
@@ -79,6 +84,22 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
 
     queryset = Project.objects.all()
     permission_classes = (permissions.IsAuthenticated,)
+    version_models = (Project, Edition, EditionForm, Form, EditionOrganizer,
+                      Participation)
+    # editions tell whether the current user participates
+    etag_vary_on_user = True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            editions = (
+                Edition.objects
+                .select_related('project', 'edition_form__form')
+                .with_participation_info(self.request.user)
+            )
+            queryset = queryset.prefetch_related(
+                Prefetch('editions', queryset=editions))
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -213,6 +234,13 @@ class EditionViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = (filters.backends.DjangoFilterBackend,)
     filter_fields = ('project', 'year',)
 
+    def get_queryset(self):
+        return (
+            super().get_queryset()
+            .select_related('project', 'edition_form__form')
+            .with_participation_info(self.request.user)
+        )
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return EditionDetailSerializer
@@ -422,6 +450,41 @@ class ParticipationViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
             error = {'detail': 'Participation must be in cancelled state'}
             return Response(error, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(methods=['post'], detail=False,
+            permission_classes=(permissions.IsAdminUser,),
+            serializer_class=ParticipationStateSerializer)
+    def set_state(self, request):
+        """Change the state of several participations at once.
+
+        All participations are updated in a single transaction, and
+        notifications are sent as if they were updated one by one.
+        Participations already in the target state are left untouched.
+
+        If a participation does not exist or cannot be moved to the target
+        state (a cancelled participation can only be sent back to the
+        "pending" state), none are updated and a `400 Bad Request` error
+        response is returned.
+
+        Only available to staff members.
+
+        ### Example request
+
+            {
+                "ids": [3, 4, 7],
+                "state": "accepted"
+            }
+
+        ### Example response
+
+            {
+                "updated": 3
+            }
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changed = serializer.save()
+        return Response({'updated': len(changed)})
+
     @action(methods=['get'], detail=True)
     def form_entry(self, request, pk=None):
         """Return the answers to the edition form for a participation.
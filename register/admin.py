@@ -2,26 +2,13 @@
 
 from django.contrib import admin
 from .models import Registration
-from profiles.models import Student
+from profiles.filters import SchoolFilter
 
 
-class SchoolFilter(admin.SimpleListFilter):
-    title = 'établissement'
-    parameter_name = 'profiles__school'
+class RegistrationSchoolFilter(SchoolFilter):
+    """Filter registrations by the school of their student."""
 
-    def lookups(self, request, model_admin):
-        list_of_school = []
-        query = Student.objects.values_list(
-            "school", flat=True).distinct()
-        for school in query:
-            list_of_school.append((school, school))
-        return list_of_school
-
-    def queryset(self, request, queryset):
-        if self.value():
-            emails = Student.objects.filter(
-                school=self.value()).values_list("user__email", flat=True)
-            return queryset.filter(email__in=emails)
+    school_field = 'student__school'
 
 
 @admin.register(Registration)
@@ -30,5 +17,5 @@ class RegistrationAdmin(admin.ModelAdmin):
 
     list_display = ('last_name', 'first_name', 'submitted')
     readonly_fields = ('submitted',)
-    list_filter = (SchoolFilter,
+    list_filter = (RegistrationSchoolFilter,
                    'submitted', 'validated')
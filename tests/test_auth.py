@@ -1,8 +1,12 @@
 """Test the authentication mechanism used by the API."""
 
+from django.core.cache import cache
+from django.test import override_settings
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
+from api.checks import check_token_cache_is_shared
 from users.factory import UserFactory
 from users.serializers import UserSerializer
 
@@ -57,3 +61,63 @@ class TestTokenAuth(APITestCase):
         response = self.client.get('/api/users/')
         self.assertEqual(response.status_code, status.HTTP_200_OK,
                          response.data)
+
+
+@override_settings(API_TOKEN_CACHE='default')
+class CachedTokenAuthTest(APITestCase):
+    """Test the cache of authentication tokens."""
+
+    url = '/api/users/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory.create()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def get(self):
+        return self.client.get(self.url)
+
+    def test_token_and_user_are_cached(self):
+        self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):  # the list of users
+            response = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        self.assertEqual(self.get().status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_deleted(self):
+        self.get()
+        self.token.delete()
+        self.assertEqual(self.get().status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_deactivated(self):
+        self.get()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get().status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_changed(self):
+        self.get()
+        self.user.set_password('new password')
+        self.user.save()
+        self.get()
+        user = self.get().wsgi_request.user
+        self.assertTrue(user.check_password('new password'))
+
+    @override_settings(API_TOKEN_CACHE=None)
+    def test_not_cached_by_default(self):
+        self.get()
+        with self.assertNumQueries(2):  # the token and the list of users
+            self.get()
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_is_reported(self):
+        errors = check_token_cache_is_shared(None)
+        self.assertEqual([error.id for error in errors], ['api.W001'])
@@ -0,0 +1,139 @@
+"""Test the caching of serialized representations."""
+
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from dynamicforms.models import Form, FormEntry, Question, Section
+from projects.factory import EditionFactory
+from projects.models import EditionForm, Participation
+from users.factory import UserFactory
+
+
+class CachedRepresentationTestMixin:
+    """Utilities to test cached representations.
+
+    Version stamps are renewed when transactions commit, hence test cases
+    must not run in a transaction.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory.create()
+        self.client.force_login(self.user)
+
+    def get(self, url, *tables):
+        """Perform a GET request and return the queries on some tables."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = [query['sql'] for query in queries.captured_queries
+               if any(table in query['sql'] for table in tables)]
+        return response, sql
+
+
+class FormDetailCacheTest(CachedRepresentationTestMixin,
+                          APITransactionTestCase):
+    """Test the cache of form representations."""
+
+    def setUp(self):
+        super().setUp()
+        self.form = Form.objects.create(title='Inscriptions')
+        section = Section.objects.create(title='Identité', form=self.form)
+        Question.objects.create(text='Nom', type='text', section=section)
+        self.url = f'/api/forms/{self.form.pk}/'
+
+    def test_cache_hit(self):
+        first, queries = self.get(self.url, 'dynamicforms_section')
+        self.assertEqual(len(queries), 1)
+        second, queries = self.get(self.url, 'dynamicforms_section')
+        self.assertEqual(queries, [])
+        self.assertEqual(second.data, first.data)
+
+    def test_invalidated_on_question_save(self):
+        self.get(self.url)
+        question = Question.objects.get()
+        question.text = 'Prénom'
+        question.save()
+        response, _ = self.get(self.url)
+        questions = response.data['sections'][0]['questions']
+        self.assertEqual(questions[0]['text'], 'Prénom')
+
+    def test_invalidated_on_section_delete(self):
+        self.get(self.url)
+        Section.objects.all().delete()
+        response, _ = self.get(self.url)
+        self.assertEqual(response.data['sections'], [])
+
+    def test_entries_count_not_cached(self):
+        self.get(self.url)
+        FormEntry.objects.create(form=self.form)
+        response, _ = self.get(self.url)
+        self.assertEqual(response.data['entries_count'], 1)
+
+    def test_file_based_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        caches = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }}
+        with override_settings(CACHES=caches):
+            first, _ = self.get(self.url)
+            second, queries = self.get(self.url, 'dynamicforms_section')
+        self.assertEqual(queries, [])
+        self.assertEqual(second.data, first.data)
+
+
+class EditionDetailCacheTest(CachedRepresentationTestMixin,
+                             APITransactionTestCase):
+    """Test the cache of forms within edition representations."""
+
+    def setUp(self):
+        super().setUp()
+        self.edition = EditionFactory.create()
+        EditionForm.objects.create(
+            edition=self.edition, form=Form.objects.create(title='Form'),
+            deadline='2018-06-30')
+        self.url = f'/api/editions/{self.edition.pk}/'
+
+    def test_cache_hit(self):
+        first, queries = self.get(self.url, 'dynamicforms_section')
+        self.assertTrue(queries)
+        second, queries = self.get(self.url, 'dynamicforms_section')
+        self.assertEqual(queries, [])
+        self.assertEqual(second.data, first.data)
+
+    def test_participates_not_cached(self):
+        Participation.objects.create(user=self.user, edition=self.edition)
+        response, _ = self.get(self.url)
+        self.assertTrue(response.data['participates'])
+        self.client.force_login(UserFactory.create())
+        response, _ = self.get(self.url)
+        self.assertFalse(response.data['participates'])
+
+    def test_user_changes_are_returned(self):
+        user = UserFactory.create(first_name='John')
+        Participation.objects.create(user=user, edition=self.edition)
+        self.get(self.url)
+        user.first_name = 'Jane'
+        user.save()
+        response, _ = self.get(self.url)
+        participant = response.data['participations'][0]['user']
+        self.assertEqual(participant['first_name'], 'Jane')
+
+    def test_bulk_state_change_is_returned(self):
+        participation = Participation.objects.create(
+            user=UserFactory.create(), edition=self.edition)
+        self.get(self.url)
+        Participation.objects.filter(pk=participation.pk).set_state(
+            Participation.STATE_ACCEPTED)
+        response, _ = self.get(self.url)
+        self.assertEqual(response.data['participations'][0]['state'],
+                         Participation.STATE_ACCEPTED)
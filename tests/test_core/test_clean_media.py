@@ -1,8 +1,14 @@
 import os.path
-from django.test import TestCase
+import shutil
+import tempfile
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.core.files import File
 from django.core.management import call_command
+from core.factory import DocumentFactory
 from visits.factory import VisitFactory
 from visits.models import Visit
 from core.management.commands.utils import DataLoader
@@ -17,6 +23,12 @@ class CleanMediaTest(TestCase):
     non_ref_file_path = os.path.join(safe_location, non_ref_file_name)
 
     def setUp(self):
+        # store files in a temporary media root
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
         # create objects in DB with references to files
         with DataLoader().load(self.ref_file_name) as fact_sheet:
             visit = VisitFactory.create(fact_sheet=fact_sheet)
@@ -45,3 +57,16 @@ class CleanMediaTest(TestCase):
 
         # safe location must have been emptied and deleted
         self.assertFalse(default_storage.exists(self.safe_location))
+
+    def clean(self):
+        out = StringIO()
+        call_command('cleanmedia', top=self.safe_location, stdout=out)
+        return out.getvalue()
+
+    def test_markdown_references_are_kept(self):
+        path = os.path.join(self.safe_location, 'images', 'cat.png')
+        path = default_storage.save(path, ContentFile(b'cat'))
+        DocumentFactory.create(content=f'![cat](/media/{path})')
+        self.clean()
+        self.assertTrue(default_storage.exists(path))
+        self.assertFalse(default_storage.exists(self.non_ref_file_path))
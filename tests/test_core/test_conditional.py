@@ -0,0 +1,140 @@
+"""Test conditional GET requests on read-mostly endpoints."""
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from core.factory import DocumentFactory
+from dynamicforms.models import Form, Section
+from projects.factory import EditionFactory, ProjectFactory
+from projects.models import Participation
+from users.factory import UserFactory
+
+
+class ConditionalGetTestMixin:
+    """Utilities to perform conditional GET requests.
+
+    Version stamps are renewed when transactions commit, hence test cases
+    must not run in a transaction.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory.create()
+        self.client.force_login(self.user)
+
+    def get(self, url, etag=None):
+        headers = {} if etag is None else {'HTTP_IF_NONE_MATCH': etag}
+        return self.client.get(url, **headers)
+
+
+class DocumentConditionalGetTest(ConditionalGetTestMixin,
+                                 APITransactionTestCase):
+    """Test conditional GET requests on documents."""
+
+    def setUp(self):
+        super().setUp()
+        self.document = DocumentFactory.create()
+        self.url = f'/api/documents/{self.document.slug}/'
+
+    def test_etag_returned(self):
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+
+    def test_not_modified(self):
+        etag = self.get(self.url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(self.url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        # only authentication queries are performed
+        for query in queries.captured_queries:
+            self.assertNotIn('core_document', query['sql'])
+
+    def test_modified_after_save(self):
+        etag = self.get(self.url)['ETag']
+        self.document.title = 'Nouveau titre'
+        self.document.save()
+        response = self.get(self.url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Nouveau titre')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_versions_are_not_per_process(self):
+        etag = self.get(self.url)['ETag']
+        cache.clear()
+        response = self.get(self.url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_modified_once_committed(self):
+        etag = self.get(self.url)['ETag']
+        with transaction.atomic():
+            self.document.title = 'Nouveau titre'
+            self.document.save()
+            response = self.get(self.url, etag=etag)
+            self.assertEqual(response.status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+        response = self.get(self.url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_modified_after_delete(self):
+        etag = self.get('/api/documents/')['ETag']
+        self.document.delete()
+        response = self.get('/api/documents/', etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_etag_depends_on_url(self):
+        other = DocumentFactory.create()
+        etag = self.get(self.url)['ETag']
+        response = self.get(f'/api/documents/{other.slug}/', etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_no_etag_on_not_found(self):
+        response = self.get('/api/documents/unknown/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
+
+
+class FormConditionalGetTest(ConditionalGetTestMixin,
+                             APITransactionTestCase):
+    """Test conditional GET requests on forms."""
+
+    def test_modified_when_section_added(self):
+        form = Form.objects.create(title='Inscriptions')
+        url = f'/api/forms/{form.pk}/'
+        etag = self.get(url)['ETag']
+        self.assertEqual(self.get(url, etag=etag).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        Section.objects.create(title='Informations', form=form)
+        response = self.get(url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['sections']), 1)
+
+
+class ProjectConditionalGetTest(ConditionalGetTestMixin,
+                                APITransactionTestCase):
+    """Test conditional GET requests on projects."""
+
+    def setUp(self):
+        super().setUp()
+        self.project = ProjectFactory.create(logo=None)
+        self.edition = EditionFactory.create(project=self.project)
+        self.url = f'/api/projects/{self.project.pk}/'
+
+    def test_etag_depends_on_user(self):
+        etag = self.get(self.url)['ETag']
+        self.client.force_login(UserFactory.create())
+        response = self.get(self.url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_modified_when_user_participates(self):
+        etag = self.get(self.url)['ETag']
+        Participation.objects.create(user=self.user, edition=self.edition)
+        response = self.get(self.url, etag=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['editions'][0]['participates'])
@@ -0,0 +1,158 @@
+"""Test the streaming CSV and XLSX exports."""
+
+import codecs
+import csv
+import zipfile
+from io import BytesIO, StringIO
+
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+
+from core.exports import Column, iter_csv, iter_rows, iter_xlsx
+from profiles.factory import StudentFactory, TutorFactory
+from profiles.models import Student, Tutor
+from projects.factory import EditionFactory
+from projects.models import Participation as ProjectParticipation
+from users.factory import UserFactory
+from users.models import User
+from visits.factory import VisitFactory
+from visits.models import Participation as VisitParticipation
+
+
+def read_csv(response) -> list:
+    content = b''.join(response.streaming_content)
+    assert content.startswith(codecs.BOM_UTF8)
+    text = content[len(codecs.BOM_UTF8):].decode()
+    return list(csv.reader(StringIO(text), delimiter=';'))
+
+
+class IterCsvTest(TestCase):
+    """Test the iter_csv function."""
+
+    def test_rows_are_chunked(self):
+        rows = [[i, 'a;b'] for i in range(5)]
+        chunks = list(iter_csv(rows, rows_per_chunk=2))
+        # BOM, 2 full chunks and the remainder
+        self.assertEqual(len(chunks), 4)
+        text = b''.join(chunks)[len(codecs.BOM_UTF8):].decode()
+        self.assertEqual(text.splitlines()[0], '0;"a;b"')
+
+
+class IterXlsxTest(TestCase):
+    """Test the iter_xlsx function."""
+
+    def test_is_a_workbook(self):
+        rows = [['name', 'count'], ['<Café & co>', 3], [None, True]]
+        archive = zipfile.ZipFile(BytesIO(b''.join(iter_xlsx(rows))))
+        self.assertIn('xl/workbook.xml', archive.namelist())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('&lt;Café &amp; co&gt;', sheet)
+        self.assertIn('<c><v>3</v></c>', sheet)
+        self.assertIn('<c t="b"><v>1</v></c>', sheet)
+
+
+class IterRowsTest(TestCase):
+    """Test building rows from column specs."""
+
+    def setUp(self):
+        for school in ('Lycée A', 'Lycée B'):
+            StudentFactory.create(school=school)
+
+    def test_columns(self):
+        queryset = Student.objects.order_by('school')
+        columns = (
+            'school',
+            ('user__email', 'email'),
+            Column('user__first_name', 'user__last_name', header='name',
+                   transform=lambda first, last: f'{first} {last}'),
+        )
+        with self.assertNumQueries(1):
+            header, *rows = iter_rows(queryset, columns)
+        self.assertEqual(header, ['school', 'email', 'name'])
+        user = queryset.first().user
+        self.assertEqual(rows[0], [
+            'Lycée A', user.email, f'{user.first_name} {user.last_name}'])
+
+    def test_column_with_several_paths_needs_transform(self):
+        with self.assertRaises(TypeError):
+            Column('first_name', 'last_name')
+
+
+class AdminExportTest(TestCase):
+    """Test the export actions of the admin panels."""
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        edition = EditionFactory.create()
+        visit = VisitFactory.create()
+        for school in ('Lycée A', 'Lycée B', 'Lycée C'):
+            user = StudentFactory.create(school=school).user
+            ProjectParticipation.objects.create(user=user, edition=edition)
+            VisitParticipation.objects.create(user=user, visit=visit)
+        # A participant without a student profile
+        user = UserFactory.create()
+        ProjectParticipation.objects.create(user=user, edition=edition)
+
+    def export(self, model, queryset):
+        model_admin = site._registry[model]
+        response = model_admin.export_as_csv(self.request, queryset)
+        with self.assertNumQueries(1):
+            return response, read_csv(response)
+
+    def test_project_participations(self):
+        queryset = ProjectParticipation.objects.order_by('pk')
+        response, (header, *rows) = self.export(
+            ProjectParticipation, queryset)
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename=projects.participation.csv')
+        self.assertEqual(header[:3], ['first_name', 'last_name', 'school'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row[2] for row in rows],
+                         ['Lycée A', 'Lycée B', 'Lycée C', ''])
+        participation = queryset.first()
+        self.assertEqual(rows[0][0], participation.user.first_name)
+        self.assertEqual(rows[0][header.index('user')],
+                         str(participation.user))
+        self.assertEqual(rows[0][header.index('edition')],
+                         str(participation.edition))
+
+    def test_visit_participations(self):
+        queryset = VisitParticipation.objects.all()
+        _, (header, *rows) = self.export(VisitParticipation, queryset)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0][header.index('visit')],
+                         str(queryset.first().visit))
+
+    def test_students(self):
+        _, (header, *rows) = self.export(Student, Student.objects.all())
+        self.assertEqual(len(rows), 3)
+        self.assertIn('email', header)
+        self.assertNotIn('user', header)
+
+    def test_relations_are_exported_as_text(self):
+        tutors = TutorFactory.create_batch(2)
+        model_admin = site._registry[Tutor]
+        response = model_admin.export_as_csv(
+            self.request, Tutor.objects.order_by('pk'))
+        # Addresses are fetched with a single query
+        with self.assertNumQueries(2):
+            header, *rows = read_csv(response)
+        self.assertEqual([row[header.index('address')] for row in rows],
+                         [str(tutor.address) for tutor in tutors])
+
+    def test_users_without_passwords(self):
+        _, (header, *rows) = self.export(User, User.objects.all())
+        self.assertEqual(len(rows), User.objects.count())
+        self.assertNotIn('password', header)
+
+    def test_xlsx(self):
+        model_admin = site._registry[Student]
+        response = model_admin.export_as_xlsx(
+            self.request, Student.objects.all())
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename=profiles.student.xlsx')
+        content = b''.join(response.streaming_content)
+        archive = zipfile.ZipFile(BytesIO(content))
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 4)
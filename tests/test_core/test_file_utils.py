@@ -0,0 +1,164 @@
+"""Test the storage file utilities."""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from django.core.files.storage import FileSystemStorage
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from core.file_utils import delete_files, list_files, remove_empty_dirs, walk
+
+
+class SlowStorage(FileSystemStorage):
+    """File system storage with an artificial listing latency.
+
+    Records the peak number of directories listed at the same time.
+    Listings of the top-level directories wait for each other at the
+    `barrier`, if given.
+    """
+
+    latency = 0.02
+
+    def __init__(self, *args, barrier=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.barrier = barrier
+        self.listing = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def listdir(self, path):
+        with self._lock:
+            self.listing += 1
+            self.peak = max(self.peak, self.listing)
+        try:
+            if self.barrier is not None and path and '/' not in path:
+                self.barrier.wait()
+            time.sleep(self.latency)
+            return super().listdir(path)
+        finally:
+            with self._lock:
+                self.listing -= 1
+
+
+def make_s3_storage(location='media'):
+    """Return a fake S3 storage whose client is a mock."""
+    storage = MagicMock(spec=S3Boto3Storage)
+    storage.bucket_name = 'bucket'
+    storage.location = location
+    storage._clean_name.side_effect = lambda name: name
+    storage._normalize_name.side_effect = lambda name: (
+        f'{location}/{name}' if location else name)
+    return storage
+
+
+class S3StorageTest(TestCase):
+    """Test listing and deleting files on S3."""
+
+    def setUp(self):
+        self.storage = make_s3_storage()
+        self.client = self.storage.connection.meta.client
+
+    def test_list_files_flat(self):
+        paginator = self.client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'Contents': [{'Key': 'media/a/1.png', 'ETag': '"1"'},
+                          {'Key': 'media/a/b/', 'ETag': '"d"'}]},
+            {'Contents': [{'Key': 'media/a/b/2.png', 'ETag': '"2"'}]},
+        ]
+        files = list(list_files(self.storage, 'a'))
+        self.assertEqual(files, ['a/1.png', 'a/b/2.png'])
+        self.client.get_paginator.assert_called_once_with('list_objects_v2')
+        paginator.paginate.assert_called_once_with(
+            Bucket='bucket', Prefix='media/a/')
+
+    def test_delete_files_in_batches(self):
+        self.client.delete_objects.side_effect = [
+            {'Errors': [{'Key': 'media/file-3'}]}, {}, {}]
+        paths = [f'file-{i}' for i in range(2500)]
+        failed = delete_files(self.storage, paths)
+        self.assertEqual(self.client.delete_objects.call_count, 3)
+        batches = [call[1]['Delete']['Objects']
+                   for call in self.client.delete_objects.call_args_list]
+        self.assertEqual([len(batch) for batch in batches],
+                         [1000, 1000, 500])
+        self.assertEqual(batches[0][0], {'Key': 'media/file-0'})
+        self.assertEqual(failed, ['file-3'])
+
+    def test_no_empty_dirs_removal(self):
+        remove_empty_dirs(self.storage, ['a/1.png'])
+        self.assertFalse(self.storage.method_calls)
+
+
+class WalkTest(TestCase):
+    """Test walking through a storage, sequentially or concurrently."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        # 3 directories with 3 subdirectories each, containing a file
+        for i in range(3):
+            for j in range(3):
+                directory = os.path.join(self.root, f'd{i}', f's{j}')
+                os.makedirs(directory)
+                with open(os.path.join(directory, 'file.txt'), 'w') as f:
+                    f.write('data')
+        self.storage = SlowStorage(location=self.root)
+
+    def walk(self, **kwargs):
+        return [(top, sorted(dirs), files)
+                for top, dirs, files in walk(self.storage, '', **kwargs)]
+
+    def test_same_output_as_os_walk(self):
+        expected = [
+            ('' if top == self.root else os.path.relpath(top, self.root),
+             sorted(dirs), files)
+            for top, dirs, files in os.walk(self.root)
+        ]
+        self.assertEqual(sorted(self.walk(workers=4)), sorted(expected))
+
+    def test_concurrent_walk_keeps_order(self):
+        for topdown in (True, False):
+            self.assertEqual(self.walk(topdown=topdown, workers=4),
+                             self.walk(topdown=topdown))
+
+    def test_topdown_pruning(self):
+        visited = []
+        for top, dirs, files in walk(self.storage, '', workers=4):
+            visited.append(top)
+            if top == '':
+                dirs[:] = ['d1']
+        self.assertEqual(sorted(visited),
+                         ['', 'd1', 'd1/s0', 'd1/s1', 'd1/s2'])
+
+    def test_bottom_up(self):
+        tops = [top for top, _, _ in walk(self.storage, '', topdown=False,
+                                          workers=4)]
+        self.assertEqual(tops[-1], '')
+        self.assertLess(tops.index('d0/s0'), tops.index('d0'))
+
+    def test_onerror(self):
+        errors = []
+        result = list(walk(self.storage, 'missing', onerror=errors.append,
+                           workers=4))
+        self.assertEqual(result, [])
+        self.assertEqual(len(errors), 1)
+
+    def test_interrupted(self):
+        for _ in walk(self.storage, '', workers=2):
+            break
+
+    def test_directories_listed_concurrently(self):
+        self.walk()
+        self.assertEqual(self.storage.peak, 1)
+        # d0, d1 and d2 can only be listed at the same time
+        storage = SlowStorage(location=self.root,
+                              barrier=threading.Barrier(3, timeout=5))
+        errors = []
+        list(walk(storage, '', onerror=errors.append, workers=4))
+        self.assertEqual(errors, [])
+        self.assertGreaterEqual(storage.peak, 3)
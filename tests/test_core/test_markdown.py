@@ -1,6 +1,9 @@
 import os
-from django.test import TestCase
-from core.markdown import extract_md_file_refs
+
+from django.test import RequestFactory, TestCase
+from core.markdown import (MdImageRef, _add_domain, add_domain_to_image_files,
+                           extract_md_file_refs, get_source_hash)
+from visits.factory import VisitFactory
 
 
 class ExtractFileRefsTest(TestCase):
@@ -33,7 +36,58 @@ class ExtractFileRefsTest(TestCase):
         self.assertExtracts(md, ['www.findithere.com'])
 
 
-# TODO test MdFileRef class
-# TODO test extract_image_refs
-# TODO test add_domain_to_image_files
-# TODO test _get_domain
+class AddDomainToImageFilesTest(TestCase):
+    """Test the add_domain_to_image_files function."""
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def add_domain(self, content):
+        return add_domain_to_image_files(self.request, content)
+
+    def test_images(self):
+        md = 'A ![cat](/media/cat.png) and a ![dog](/media/dog.png).'
+        self.assertEqual(
+            self.add_domain(md),
+            'A ![cat](http://testserver/media/cat.png) '
+            'and a ![dog](http://testserver/media/dog.png).')
+
+    def test_repeated_image(self):
+        md = '![cat](/media/cat.png) ![cat](/media/cat.png)'
+        self.assertEqual(
+            self.add_domain(md),
+            '![cat](http://testserver/media/cat.png) '
+            '![cat](http://testserver/media/cat.png)')
+
+    def test_external_images_and_links_untouched(self):
+        md = ('![cat](https://cats.com/cat.png) '
+              '[download](/media/file.pdf)')
+        self.assertEqual(self.add_domain(md), md)
+
+    def test_memoized_by_domain_and_hash(self):
+        md = '![cat](/media/cat.png)'
+        key = ('http://testserver', get_source_hash(md))
+        _add_domain.results[key] = 'memoized'
+        self.addCleanup(_add_domain.results.pop, key, None)
+        self.assertEqual(self.add_domain(md), 'memoized')
+        request = RequestFactory().get('/', HTTP_HOST='localhost')
+        self.assertEqual(add_domain_to_image_files(request, md),
+                         '![cat](http://localhost/media/cat.png)')
+
+    def test_same_result_as_legacy(self):
+        """Rewriting in a single pass gives the same result."""
+        paragraphs = []
+        for i in range(200):
+            paragraphs.append(VisitFactory.build().description)
+            paragraphs.append(f'![image {i}](/media/visits/{i}.png)')
+        content = '\n\n'.join(paragraphs)
+        domain = 'http://example.com'
+
+        # rewrite used to be done with one replace() per image
+        expected = content
+        for ref in MdImageRef.find(content):
+            new_ref = MdImageRef(legend=ref.legend,
+                                 file_path=domain + ref.file_path)
+            expected = expected.replace(str(ref), str(new_ref))
+
+        self.assertEqual(_add_domain.__wrapped__(domain, content), expected)
@@ -0,0 +1,96 @@
+"""Test the pre-rendered HTML of Markdown fields."""
+
+from importlib import import_module
+from unittest.mock import patch
+
+from django.apps import apps
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from tests.utils import SimpleAPITestCase
+
+from core.factory import DocumentFactory
+from core.markdown import get_source_hash
+from core.models import Document
+from projects.factory import EditionFactory
+from users.factory import UserFactory
+
+
+class MarkdownHTMLTest(TestCase):
+    """Test the storage of the HTML rendering of Markdown fields."""
+
+    def test_rendered_on_save(self):
+        document = DocumentFactory.create(content='**Hello**')
+        document.refresh_from_db()
+        self.assertEqual(document.content_html,
+                         '<p><strong>Hello</strong></p>')
+        self.assertEqual(len(document.content_hash), 40)
+
+    def test_rendered_on_save_with_update_fields(self):
+        document = DocumentFactory.create(content='Hello')
+        document.content = '*Hello*'
+        document.save(update_fields=['content'])
+        document.refresh_from_db()
+        self.assertEqual(document.content_html, '<p><em>Hello</em></p>')
+
+    def test_not_rendered_again_if_unchanged(self):
+        document = DocumentFactory.create(content='Hello')
+        document.title = 'Title'
+        with patch('core.models.render_markdown') as render:
+            document.save()
+        render.assert_not_called()
+
+    def test_rendered_lazily_when_out_of_date(self):
+        document = DocumentFactory.create(content='Hello')
+        Document.objects.filter(pk=document.pk).update(content='*Bye*')
+        document.refresh_from_db()
+        with self.assertNumQueries(0):
+            html = document.get_markdown_html('content')
+        self.assertEqual(html, '<p><em>Bye</em></p>')
+        # reading does not write to the database
+        document.refresh_from_db()
+        self.assertEqual(document.content_html, '<p>Hello</p>')
+
+    def test_existing_rows_rendered_by_migration(self):
+        migration = import_module('core.migrations.0002_markdown_html')
+        document = DocumentFactory.create(content='*Hello*')
+        Document.objects.update(content_html='', content_hash='')
+        migration.render_markdown_html(apps, None)
+        document.refresh_from_db()
+        self.assertEqual(document.content_html, '<p><em>Hello</em></p>')
+        self.assertEqual(document.content_hash, get_source_hash('*Hello*'))
+
+
+class MarkdownFormatTest(SimpleAPITestCase):
+    """Test the format of Markdown fields in the API."""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(UserFactory.create())
+        self.document = DocumentFactory.create(
+            content='![cat](/media/cat.png)')
+        self.url = f'/api/documents/{self.document.slug}/'
+
+    def test_markdown_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content'],
+                         '![cat](http://testserver/media/cat.png)')
+
+    def test_html(self):
+        with patch('core.models.render_markdown') as render:
+            response = self.client.get(self.url, {'markdown': 'html'})
+        render.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['content'],
+            '<p><img alt="cat" src="http://testserver/media/cat.png" /></p>')
+
+    def test_html_in_edition_details(self):
+        edition = EditionFactory.create(description='*Hello*')
+        url = f'/api/editions/{edition.pk}/'
+        response = self.client.get(url)
+        self.assertEqual(response.data['description'], '*Hello*')
+        response = self.client.get(url, {'markdown': 'html'})
+        self.assertEqual(response.data['description'],
+                         '<p><em>Hello</em></p>')
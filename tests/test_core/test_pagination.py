@@ -0,0 +1,79 @@
+"""Test the API pagination."""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from tests.utils import SimpleAPITestCase
+
+from core.pagination import CursorPagination
+from projects.factory import EditionFactory, ProjectFactory
+from projects.models import Edition
+from users.factory import UserFactory
+from visits.models import Participation
+
+
+class CursorPaginationTest(SimpleAPITestCase):
+    """Test the opt-in cursor pagination of list endpoints."""
+
+    url = '/api/editions/'
+
+    def setUp(self):
+        project = ProjectFactory.create(logo=None)
+        # Several editions share the same year
+        for year in (2018, 2016, 2018, 2017, 2018):
+            EditionFactory.create(project=project, year=year)
+        self.client.force_login(UserFactory.create())
+
+    def test_not_paginated_by_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    def test_paginated_with_page_size(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['previous'])
+        self.assertIn('page_size=2', response.data['next'])
+
+    def test_pages_follow_model_ordering(self):
+        years = []
+        ids = []
+        url = f'{self.url}?page_size=2'
+        while url:
+            response = self.client.get(url)
+            results = response.data['results']
+            years += [edition['year'] for edition in results]
+            ids += [edition['id'] for edition in results]
+            url = response.data['next']
+        self.assertEqual(years, [2018, 2018, 2018, 2017, 2016])
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_following_pages_filter_by_position(self):
+        response = self.client.get(self.url, {'page_size': 4})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data['next'])
+        page_query = next(query['sql'] for query in queries.captured_queries
+                          if 'LIMIT' in query['sql'])
+        self.assertIn('"year" <', page_query)
+        self.assertNotIn('OFFSET', page_query)
+
+    def test_max_page_size(self):
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_ties_are_ordered_by_pk(self):
+        ordering = CursorPagination().get_ordering(
+            RequestFactory().get(self.url), Edition.objects.all(), None)
+        self.assertEqual(ordering, ('-year', '-pk'))
+
+    def test_nullable_ordering_is_rejected(self):
+        # visits participations are ordered by a nullable date
+        with self.assertRaises(ImproperlyConfigured):
+            CursorPagination().get_ordering(
+                RequestFactory().get(self.url),
+                Participation.objects.all(), None)
@@ -0,0 +1,75 @@
+"""Test the deferred side effects of student profile updates."""
+
+import time
+
+from django.core import mail
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from profiles import dispatch
+from profiles.factory import StudentFactory
+
+
+@override_settings(MAILS_ENABLED=True, MAILS_OUTBOX_ENABLED=False,
+                   PROFILES_DISPATCH_ASYNC=False,
+                   TELEGRAM={'bot_token': None, 'channel_name': 'test'})
+class StudentUpdatedTest(TransactionTestCase):
+    """Test notifications sent when a student fills in their data."""
+
+    def setUp(self):
+        cache.clear()
+        self.student = StudentFactory.create()
+        mail.outbox = []
+
+    def fill_in(self):
+        self.student.city = 'Paris'
+        self.student.save()
+
+    def test_no_notification_without_personal_data(self):
+        self.student.save()
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_docs_sent_after_commit(self):
+        with transaction.atomic():
+            self.fill_in()
+            self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.student.user.email])
+
+    def test_nothing_sent_if_rolled_back(self):
+        try:
+            with transaction.atomic():
+                self.fill_in()
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_repeated_saves_notify_once(self):
+        with transaction.atomic():
+            self.fill_in()
+            self.fill_in()
+        self.fill_in()
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(PROFILES_NOTIFY_DEBOUNCE=0.01)
+    def test_saves_after_debounce_delay_notify_again(self):
+        self.fill_in()
+        time.sleep(0.02)
+        self.fill_in()
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class TelegramBotTest(TestCase):
+    """Test the shared Telegram bot."""
+
+    @override_settings(TELEGRAM={'bot_token': None, 'channel_name': 'test'})
+    def test_no_bot_without_token(self):
+        self.assertIsNone(dispatch.get_telegram_bot())
+
+    @override_settings(TELEGRAM={'bot_token': '123:abc', 'channel_name': 't'})
+    def test_bot_is_reused(self):
+        bot = dispatch.get_telegram_bot()
+        self.assertIsNotNone(bot)
+        self.assertIs(dispatch.get_telegram_bot(), bot)
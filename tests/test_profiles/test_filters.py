@@ -0,0 +1,77 @@
+"""Test the profiles admin filters."""
+
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from profiles.factory import StudentFactory
+from profiles.filters import SchoolFilter, get_schools
+from projects.factory import EditionFactory
+from projects.models import Participation
+from register.admin import RegistrationSchoolFilter
+from register.models import Registration
+from users.factory import UserFactory
+
+
+class SchoolFilterTest(TestCase):
+    """Test filtering objects by school."""
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/')
+        self.students = [StudentFactory.create(school=school)
+                         for school in ('Lycée B', 'Lycée A', 'Lycée B')]
+        StudentFactory.create(school=None)
+
+    def get_filter(self, filter_class, model, value=None):
+        params = {} if value is None else {'profiles__school': value}
+        return filter_class(self.request, params, model, site._registry[model])
+
+    def test_schools_are_cached(self):
+        self.assertEqual(get_schools(), ['Lycée A', 'Lycée B'])
+        with self.assertNumQueries(0):
+            lookups = self.get_filter(SchoolFilter, Participation).lookups(
+                self.request, None)
+        self.assertEqual(lookups, [('Lycée A', 'Lycée A'),
+                                   ('Lycée B', 'Lycée B')])
+
+    def test_cache_invalidated_on_student_save(self):
+        get_schools()
+        student = self.students[0]
+        student.school = 'Lycée C'
+        student.save()
+        self.assertEqual(get_schools(), ['Lycée A', 'Lycée B', 'Lycée C'])
+
+    def test_cache_invalidated_on_student_delete(self):
+        get_schools()
+        self.students[1].delete()
+        self.assertEqual(get_schools(), ['Lycée B'])
+
+    def test_filter_participations(self):
+        edition = EditionFactory.create()
+        for student in self.students:
+            Participation.objects.create(user=student.user, edition=edition)
+        Participation.objects.create(user=UserFactory.create(),
+                                     edition=edition)
+        school_filter = self.get_filter(SchoolFilter, Participation,
+                                        'Lycée B')
+        queryset = school_filter.queryset(self.request,
+                                          Participation.objects.all())
+        self.assertEqual(
+            set(queryset.values_list('user_id', flat=True)),
+            {self.students[0].user_id, self.students[2].user_id})
+        self.assertNotIn('email', str(queryset.query))
+
+    def test_filter_registrations(self):
+        registration = Registration.objects.create(
+            first_name='John', last_name='Doe', email='john@example.com')
+        student = self.students[1]
+        student.registration = registration
+        student.save()
+        Registration.objects.create(
+            first_name='Jane', last_name='Doe', email='jane@example.com')
+        school_filter = self.get_filter(RegistrationSchoolFilter,
+                                        Registration, 'Lycée A')
+        queryset = school_filter.queryset(self.request,
+                                          Registration.objects.all())
+        self.assertEqual(list(queryset), [registration])
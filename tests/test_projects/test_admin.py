@@ -0,0 +1,128 @@
+"""Projects admin panels tests."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from projects.admin import EditionAdmin
+from projects.factory import EditionFactory, ProjectFactory
+from projects.models import Participation
+from users.factory import UserFactory
+from users.models import User
+
+
+class ChangelistTestMixin:
+    """Utilities to test the number of queries of admin changelists."""
+
+    url: str
+
+    def setUp(self):
+        admin = User.objects.create_superuser('admin@example.com', 'admin')
+        self.client.force_login(admin)
+
+    def get_changelist(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(self.url), params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def create_participations(self, edition, *states):
+        for state in states:
+            Participation.objects.create(
+                user=UserFactory.create(), edition=edition, state=state)
+
+
+class EditionAdminTest(ChangelistTestMixin, TestCase):
+    """Test the edition admin changelist."""
+
+    url = 'admin:projects_edition_changelist'
+
+    def test_counts(self):
+        edition = EditionFactory.create()
+        self.create_participations(
+            edition, Participation.STATE_PENDING,
+            Participation.STATE_ACCEPTED, Participation.STATE_ACCEPTED)
+        response, _ = self.get_changelist()
+        edition = response.context['cl'].result_list[0]
+        self.assertEqual(edition.num_pending, 1)
+        self.assertEqual(edition.num_accepted, 2)
+        self.assertEqual(edition.num_rejected, 0)
+
+    def test_number_of_queries_does_not_depend_on_editions(self):
+        project = ProjectFactory.create()
+        edition = EditionFactory.create(project=project, year=2018)
+        self.create_participations(edition, Participation.STATE_PENDING)
+        _, expected = self.get_changelist()
+        for year in range(2010, 2015):
+            edition = EditionFactory.create(project=project, year=year)
+            self.create_participations(edition, Participation.STATE_ACCEPTED)
+        _, num_queries = self.get_changelist()
+        self.assertEqual(num_queries, expected)
+
+    def test_sortable_by_counts(self):
+        project = ProjectFactory.create()
+        few = EditionFactory.create(project=project, year=2017)
+        many = EditionFactory.create(project=project, year=2018)
+        self.create_participations(few, Participation.STATE_ACCEPTED)
+        self.create_participations(many, *[Participation.STATE_ACCEPTED] * 3)
+        column = EditionAdmin.list_display.index('num_accepted')
+        response, _ = self.get_changelist(o=f'-{column}')
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [many, few])
+
+
+class ProjectAdminTest(ChangelistTestMixin, TestCase):
+    """Test the project admin changelist."""
+
+    url = 'admin:projects_project_changelist'
+
+    def test_counters(self):
+        project = ProjectFactory.create()
+        for year in (2017, 2018):
+            edition = EditionFactory.create(project=project, year=year)
+            self.create_participations(
+                edition, Participation.STATE_ACCEPTED,
+                Participation.STATE_REJECTED)
+        response, _ = self.get_changelist()
+        project = response.context['cl'].result_list[0]
+        self.assertEqual(project.num_editions, 2)
+        self.assertEqual(project.last_edition_year, 2018)
+        self.assertEqual(project.num_accepted, 2)
+
+    def test_number_of_queries_does_not_depend_on_projects(self):
+        EditionFactory.create(project=ProjectFactory.create(logo=None))
+        _, expected = self.get_changelist()
+        for _ in range(5):
+            EditionFactory.create(project=ProjectFactory.create(logo=None))
+        _, num_queries = self.get_changelist()
+        self.assertEqual(num_queries, expected)
+
+
+class ParticipationAdminTest(ChangelistTestMixin, TestCase):
+    """Test the participation admin actions."""
+
+    url = 'admin:projects_participation_changelist'
+
+    def setUp(self):
+        super().setUp()
+        edition = EditionFactory.create()
+        self.create_participations(edition, Participation.STATE_PENDING,
+                                   Participation.STATE_VALIDATED)
+        self.ids = list(Participation.objects.values_list('pk', flat=True))
+
+    def perform_action(self, action):
+        return self.client.post(reverse(self.url), {
+            'action': action, '_selected_action': self.ids}, follow=True)
+
+    def test_accept(self):
+        response = self.perform_action('set_state_accepted')
+        self.assertContains(response, '2 participations modifiées')
+        self.assertEqual(Participation.objects.accepted().count(), 2)
+
+    def test_cancelled_participations_are_not_changed(self):
+        Participation.objects.filter(pk=self.ids[0]).update(
+            state=Participation.STATE_CANCELLED)
+        response = self.perform_action('set_state_rejected')
+        self.assertContains(response, '1 participation annulée')
+        self.assertEqual(Participation.objects.rejected().count(), 0)
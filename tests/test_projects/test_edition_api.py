@@ -1,9 +1,14 @@
 """Editions API tests."""
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from tests.utils import SimpleAPITestCase, logged_in
 
-from projects.factory import EditionFactory, EditionFormFactory
+from projects.factory import (EditionFactory, EditionFormFactory,
+                              ParticipationFactory)
+from projects.models import EditionOrganizer
+from users.factory import UserFactory
 
 
 class EditionEndpointsTest(SimpleAPITestCase):
@@ -60,3 +65,35 @@ class EditionEndpointsTest(SimpleAPITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
+
+    def count_list_queries(self) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.perform_list()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_list_query_count_does_not_depend_on_editions(self):
+        self.client.force_login(UserFactory.create())
+        for edition in self.factory.create_batch(2):
+            ParticipationFactory.create(edition=edition)
+        num_queries = self.count_list_queries()
+        for edition in self.factory.create_batch(5):
+            EditionFormFactory.create(edition=edition)
+            ParticipationFactory.create_batch(2, edition=edition)
+        self.assertEqual(self.count_list_queries(), num_queries)
+
+    def test_list_counters_and_participates(self):
+        user = UserFactory.create()
+        self.client.force_login(user)
+        edition = self.factory.create()
+        ParticipationFactory.create(edition=edition, user=user)
+        ParticipationFactory.create(edition=edition)
+        for organizer in UserFactory.create_batch(3):
+            EditionOrganizer.objects.create(edition=edition, user=organizer)
+        response = self.perform_list()
+        data = {item['id']: item for item in response.data}
+        self.assertEqual(data[edition.pk]['participations'], 2)
+        self.assertEqual(data[edition.pk]['organizers'], 3)
+        self.assertTrue(data[edition.pk]['participates'])
+        other = next(pk for pk in data if pk != edition.pk)
+        self.assertFalse(data[other]['participates'])
@@ -1,10 +1,18 @@
 """Projects participations API tests."""
 
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
+from rest_framework.test import APITransactionTestCase
 from tests.utils import SimpleAPITestCase, logged_in
+from tests.utils.mixins import SignalTestMixin
 
+from mails.tests import CountingEmailBackend
+from projects import signals
 from projects.factory import EditionFactory, ParticipationFactory
-from users.factory import UserFactory
+from projects.models import Participation
+from users.factory import StaffUserFactory, UserFactory
 from dynamicforms.models import Form
 
 
@@ -84,3 +92,72 @@ class ParticipationCreateTest(SimpleAPITestCase):
             'id', 'user', 'edition_id', 'edition_form_title',
             'state', 'submitted'}
         self.assertSetEqual(expected, set(response.data))
+
+
+@override_settings(MAILS_ENABLED=True, MAILS_OUTBOX_ENABLED=False,
+                   EMAIL_BACKEND='mails.tests.CountingEmailBackend')
+class ParticipationSetStateTest(SignalTestMixin, APITransactionTestCase):
+    """Test changing the state of participations in bulk."""
+
+    url = '/api/project-participations/set_state/'
+
+    def setUp(self):
+        self.participations = ParticipationFactory.create_batch(3)
+        CountingEmailBackend.connections = 0
+        CountingEmailBackend.sent = []
+
+    def perform_set_state(self, state='accepted', ids=None):
+        if ids is None:
+            ids = [participation.pk for participation in self.participations]
+        return self.client.post(self.url, {'ids': ids, 'state': state},
+                                format='json')
+
+    def test_requires_staff(self):
+        self.assertEqual(self.perform_set_state().status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+        self.client.force_login(UserFactory.create())
+        self.assertEqual(self.perform_set_state().status_code,
+                         status.HTTP_403_FORBIDDEN)
+
+    def test_set_state(self):
+        self.client.force_login(StaffUserFactory.create())
+        response = self.perform_set_state()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(Participation.objects.accepted().count(), 3)
+        # A single batch of notifications
+        self.assertEqual(CountingEmailBackend.connections, 1)
+        self.assertEqual(len(CountingEmailBackend.sent), 3)
+
+    def test_single_update(self):
+        self.client.force_login(StaffUserFactory.create())
+        with CaptureQueriesContext(connection) as queries:
+            self.perform_set_state()
+        updates = [query for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE "projects_')]
+        self.assertEqual(len(updates), 1)
+
+    def test_state_signals_sent(self):
+        self.client.force_login(StaffUserFactory.create())
+        with self.assertCalled(signals.rejected):
+            self.perform_set_state(state='rejected')
+
+    def test_unknown_participation(self):
+        self.client.force_login(StaffUserFactory.create())
+        response = self.perform_set_state(ids=[self.participations[0].pk, 0])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Participation.objects.accepted().count(), 0)
+
+    def test_invalid_transition_updates_nothing(self):
+        self.client.force_login(StaffUserFactory.create())
+        cancelled = self.participations[0]
+        cancelled.state = Participation.STATE_CANCELLED
+        cancelled.save()
+        response = self.perform_set_state()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(cancelled.pk), response.data['ids'][0])
+        self.assertEqual(Participation.objects.accepted().count(), 0)
+        # Cancelled participations can be reactivated
+        response = self.perform_set_state(state='pending')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 1})
@@ -1,9 +1,12 @@
 """Project API tests."""
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from tests.utils import SimpleAPITestCase, logged_in
 
-from projects.factory import ProjectFactory
+from projects.factory import (EditionFactory, ParticipationFactory,
+                              ProjectFactory)
 
 
 class ProjectEndpointsTest(SimpleAPITestCase):
@@ -49,3 +52,20 @@ class ProjectEndpointsTest(SimpleAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         fields = set(response.data)
         self.assertSetEqual(fields, expected)
+
+    @logged_in
+    def test_retrieve_query_count_does_not_depend_on_editions(self):
+        project = self.factory.create()
+
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as context:
+                response = self.perform_retrieve(project)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context.captured_queries)
+
+        edition = EditionFactory.create(project=project)
+        ParticipationFactory.create(edition=edition)
+        num_queries = count_queries()
+        for edition in EditionFactory.create_batch(4, project=project):
+            ParticipationFactory.create(edition=edition)
+        self.assertEqual(count_queries(), num_queries)
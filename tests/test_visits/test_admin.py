@@ -0,0 +1,55 @@
+"""Visits admin panels tests."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.factory import StudentFactory
+from users.factory import UserFactory
+from users.models import User
+from visits.factory import VisitFactory
+from visits.models import Participation
+
+
+class ParticipationInlineTest(TestCase):
+    """Test the number of queries of pages with participation inlines."""
+
+    def setUp(self):
+        admin = User.objects.create_superuser('admin@example.com', 'admin')
+        self.client.force_login(admin)
+        self.visit = VisitFactory.create()
+
+    def add_participants(self, count, visit=None):
+        for _ in range(count):
+            user = StudentFactory.create(school='Lycée A').user
+            Participation.objects.create(user=user, visit=visit or self.visit)
+
+    def get(self, url):
+        # warm up caches (e.g. content types) so that only queries
+        # depending on the page contents are compared
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_visit_page(self):
+        url = reverse('admin:visits_visit_change', args=[self.visit.pk])
+        self.add_participants(1)
+        response, expected = self.get(url)
+        self.assertContains(response, 'Lycée A')
+        self.add_participants(10)
+        _, num_queries = self.get(url)
+        self.assertEqual(num_queries, expected)
+
+    def test_user_page(self):
+        user = UserFactory.create()
+        url = reverse('admin:users_user_change', args=[user.pk])
+        Participation.objects.create(user=user, visit=self.visit)
+        _, expected = self.get(url)
+        for _ in range(10):
+            Participation.objects.create(user=user,
+                                         visit=VisitFactory.create())
+        _, num_queries = self.get(url)
+        self.assertEqual(num_queries, expected)
@@ -1,10 +1,17 @@
 """Test the visits app signals."""
 
-from django.test import TestCase
+from unittest.mock import Mock
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from tests.utils.mixins import SignalTestMixin
 
 from mails.signals import notification_sent
+from mails.tests import CountingEmailBackend
+from users.factory import UserFactory
 from visits.factory import ParticipationFactory, VisitFactory
+from visits.models import Participation
 from visits.notifications import ConfirmParticipation
 from visits.signals import accepted_changed
 
@@ -35,3 +42,49 @@ class NotifyParticipationTest(SignalTestMixin, TestCase):
     def test_notification_sent_is_called_by_confirm(self):
         with self.assertCalled(notification_sent, sender=ConfirmParticipation):
             self.change(accepted=False)
+
+
+@override_settings(MAILS_ENABLED=True, MAILS_OUTBOX_ENABLED=False,
+                   EMAIL_BACKEND='mails.tests.CountingEmailBackend')
+class SetAcceptedTest(SignalTestMixin, TransactionTestCase):
+    """Test changing the status of participations in bulk."""
+
+    def setUp(self):
+        visit = VisitFactory.create()
+        self.participations = [
+            Participation.objects.create(
+                user=UserFactory.create(), visit=visit, accepted=accepted)
+            for accepted in (3, 3, 2, 1)
+        ]
+        CountingEmailBackend.connections = 0
+        CountingEmailBackend.sent = []
+
+    def test_status_updated(self):
+        changed = Participation.objects.set_accepted(1)
+        self.assertEqual(len(changed), 3)
+        self.assertEqual(Participation.objects.filter(accepted=1).count(), 4)
+
+    def test_single_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            Participation.objects.set_accepted(0)
+        updates = [query for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+
+    def test_accepted_changed_sent_for_changed_participations(self):
+        receiver = Mock()
+        accepted_changed.connect(receiver)
+        try:
+            Participation.objects.set_accepted(1)
+        finally:
+            accepted_changed.disconnect(receiver)
+        self.assertEqual(receiver.call_count, 3)
+        for call in receiver.call_args_list:
+            instance = call[1]['instance']
+            self.assertEqual(instance.accepted, 1)
+            self.assertFalse(instance.accepted_changed())
+
+    def test_notifications_sent_in_batch(self):
+        Participation.objects.set_accepted(0)
+        self.assertEqual(CountingEmailBackend.connections, 1)
+        self.assertEqual(len(CountingEmailBackend.sent), 4)
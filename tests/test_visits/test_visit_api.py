@@ -4,9 +4,10 @@ from django.test import TestCase
 from rest_framework import status
 from tests.utils import SerializerTestCaseMixin, SimpleAPITestCase
 
+from profiles.factory import TutorFactory
 from users.factory import UserFactory
 from visits.factory import VisitFactory
-from visits.models import Participation
+from visits.models import Participation, VisitOrganizer
 from visits.serializers import VisitSerializer
 
 
@@ -49,6 +50,40 @@ class VisitEndpointsTest(SimpleAPITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK,
                          response.data)
 
+    def create_visits(self, n, participants=3):
+        for visit in self.factory.create_batch(n):
+            for user in UserFactory.create_batch(participants):
+                Participation.objects.create(visit=visit, user=user)
+            VisitOrganizer.objects.create(visit=visit,
+                                          tutor=TutorFactory.create())
+
+    def test_description_is_markdown_with_absolute_images(self):
+        visit = self.factory.create(description='![cat](/media/cat.png)')
+        self.client.force_login(UserFactory.create())
+        response = self.perform_retrieve(obj=visit)
+        self.assertEqual(response.data['description'],
+                         '![cat](http://testserver/media/cat.png)')
+
+    def test_description_as_html(self):
+        visit = self.factory.create(description='![cat](/media/cat.png)')
+        self.client.force_login(UserFactory.create())
+        response = self.client.get(f'/api/visits/{visit.pk}/',
+                                   {'markdown': 'html'})
+        self.assertEqual(
+            response.data['description'],
+            '<p><img alt="cat" src="http://testserver/media/cat.png" /></p>')
+
+    # session, user, visits, participations, organizers, organizers' users
+    list_query_budget = 6
+
+    def test_list_query_budget(self):
+        self.client.force_login(UserFactory.create())
+        for num_visits in (1, 10):
+            self.create_visits(num_visits)
+            with self.assertNumQueries(self.list_query_budget):
+                response = self.perform_list()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
 
 class VisitSerializerTestCase(SerializerTestCaseMixin, TestCase):
     """Test the VisitSerializer."""
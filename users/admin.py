@@ -4,11 +4,11 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import ugettext_lazy as _
 
+from core.admin import ExportMixin
+from core.exports import model_columns
 from visits.admin import ParticipationInline
 
 from .models import User
-from django.http import HttpResponse
-import csv
 
 class UserParticipationInline(ParticipationInline):
     """Inline for Participation on the User admin panel.
@@ -16,7 +16,8 @@ class UserParticipationInline(ParticipationInline):
     All fields are read-only.
     """
 
-    readonly_fields = ('user', 'visit', 'accepted', 'present',)
+    fields = ('visit', 'submitted', 'accepted', 'present',)
+    readonly_fields = fields
     verbose_name = 'Participation aux sorties'
     verbose_name_plural = 'Participation aux sorties'
 
@@ -25,7 +26,7 @@ class UserParticipationInline(ParticipationInline):
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ExportMixin, UserAdmin):
     """Customized user admin panel."""
 
     # The fields to be used in displaying the User model.
@@ -58,19 +59,6 @@ class CustomUserAdmin(UserAdmin):
     )
     inlines = (UserParticipationInline, )
 
-    actions = ["export_as_csv"]
-
-    def export_as_csv(self, request, queryset):
-        meta = self.model._meta
-        field_names = [field.name for field in meta.fields]
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename={}.csv'.format(
-            meta)
-        writer = csv.writer(response)
-        writer.writerow(field_names)
-        for obj in queryset:
-            row = writer.writerow([getattr(obj, field)
-                                   for field in field_names])
-        return response
-    export_as_csv.short_description = "Exporter au format CSV"
+    actions = ["export_as_csv", "export_as_xlsx"]
+    # Password hashes are left out of exports
+    export_columns = model_columns(User, password=None)
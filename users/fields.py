@@ -17,5 +17,10 @@ class UserField(serializers.Field):
 
     def to_representation(self, user: User) -> dict:
         """Read from a user as serialized user data."""
-        request = self.context['request']
-        return UserSerializer(user, context={'request': request}).data
+        # Build the user serializer once, not once per represented user
+        serializer = getattr(self, '_user_serializer', None)
+        if serializer is None:
+            request = self.context['request']
+            serializer = UserSerializer(context={'request': request})
+            self._user_serializer = serializer
+        return serializer.to_representation(user)
@@ -6,35 +6,14 @@ from django.contrib import admin, messages
 from django.template.defaultfilters import pluralize
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from django.http import HttpResponse
-import csv
+from core.admin import ExportMixin
+from core.exports import PARTICIPANT_COLUMNS, model_columns
 from .models import Participation, Place, Visit
-from profiles.models import Student
-from users.models import User
-import codecs
+from profiles.filters import SchoolFilter
 
 # Register your models here.
 
 
-class SchoolFilter(admin.SimpleListFilter):
-    title = 'établissement'
-    parameter_name = 'profiles__school'
-
-    def lookups(self, request, model_admin):
-        list_of_school = []
-        query = Student.objects.values_list(
-            "school", flat=True).distinct()
-        for school in query:
-            list_of_school.append((school, school))
-        return list_of_school
-
-    def queryset(self, request, queryset):
-        if self.value():
-            emails = Student.objects.filter(
-                school=self.value()).values_list("user__email", flat=True)
-            return queryset.filter(user__email__in=emails)
-
-
 class RegistrationsOpenFilter(admin.SimpleListFilter):
     """Custom filter to filter visits by their registration openness.
 
@@ -96,6 +75,16 @@ class VisitForm(forms.ModelForm):
                 self.add_error('end_time', error)
 
 
+def _get_school(participation: Participation) -> str:
+    """Return the school of a participation's user, if they are a student.
+
+    Expects the user's student profile to be fetched along with the
+    participation, see `select_related()`.
+    """
+    student = getattr(participation.user, 'student', None)
+    return getattr(student, 'school', None)
+
+
 class ParticipationInline(admin.TabularInline):
     """Inline for Participation."""
     # template = "visits/visit_tabular.md"
@@ -105,10 +94,14 @@ class ParticipationInline(admin.TabularInline):
     fields = ('name', 'school', 'user', 'submitted', 'present')
     readonly_fields = ('name', 'school', 'user', 'submitted')
 
+    def get_queryset(self, request):
+        """Fetch the users and their student profile along with each row."""
+        return super().get_queryset(request).select_related(
+            'user__student', 'visit')
+
     def school(self, participation: Participation):
-        """Return a link to the participation's user's school."""
-        school = Student.objects.get(user=participation.user).school
-        return school
+        """Return the participation's user's school."""
+        return _get_school(participation)
     school.short_description = "Établissement"
 
     def name(self, participation: Participation):
@@ -122,10 +115,7 @@ class ParticipationInline(admin.TabularInline):
 
 def accept_selected_participations(modeladmin, request, queryset):
     """Accept selected participations in list view."""
-    for obj in queryset:
-        obj.accepted = 1
-        obj.save()
-    count = queryset.count()
+    count = len(queryset.set_accepted(1))
     s = pluralize(count)
     messages.add_message(request, messages.SUCCESS,
                          f'{count} participation{s} acceptée{s} avec succès.')
@@ -137,10 +127,7 @@ accept_selected_participations.short_description = (
 
 def reject_selected_participations(modeladmin, request, queryset):
     """Reject selected participations in list view."""
-    for obj in queryset:
-        obj.accepted = 0
-        obj.save()
-    count = queryset.count()
+    count = len(queryset.set_accepted(0))
     s = pluralize(count)
     messages.add_message(request, messages.SUCCESS,
     f'{count} participation{s} rejetée{s} avec succès.')  # rejeté place accepté
@@ -149,29 +136,13 @@ def reject_selected_participations(modeladmin, request, queryset):
 reject_selected_participations.short_description = (
     'Rejeter les participations sélectionnées')
 
-def wait_selected_participations(modeladmin, request, queryset):
-    """Reject selected participations in list view."""
-    for obj in queryset:
-        obj.accepted = 2 #in wait
-        obj.save()
-    count = queryset.count()
-    s = pluralize(count)
-    messages.add_message(request, messages.SUCCESS,
-                         f'{count} participation{s} en attente{s} avec succès.')
-
-
-wait_selected_participations.short_description = (
-    'Mettre en attentes les participations sélectionnées')
 
 def wait_selected_participations(modeladmin, request, queryset):
-    """Reject selected participations in list view."""
-    for obj in queryset:
-        obj.accepted = 2  # in wait
-        obj.save()
-    count = queryset.count()
+    """Put selected participations on the waiting list in list view."""
+    count = len(queryset.set_accepted(2))  # in wait
     s = pluralize(count)
     messages.add_message(request, messages.SUCCESS,
-                         f'{count} participation{s} en attente{s} avec succès.')
+                         f'{count} participation{s} mise{s} en attente avec succès.')
 
 
 wait_selected_participations.short_description = (
@@ -179,12 +150,14 @@ wait_selected_participations.short_description = (
 
 
 @admin.register(Participation)
-class ParticipationAdmin(admin.ModelAdmin):
+class ParticipationAdmin(ExportMixin, admin.ModelAdmin):
     """Admin panel for visit participations."""
 
     list_display = ('submitted', 'visit', 'user_link', 'accepted', 'present')
+    list_select_related = ('user__student', 'visit')
     list_filter = (SchoolFilter, 'submitted', 'accepted', 'present')
-    actions = [accept_selected_participations, reject_selected_participations]
+    actions = [accept_selected_participations, reject_selected_participations,
+               wait_selected_participations, "export_as_csv", "export_as_xlsx"]
 
     def user_link(self, participation: Participation):
         """Return a link to the participation's user."""
@@ -194,43 +167,17 @@ class ParticipationAdmin(admin.ModelAdmin):
 
     user_link.short_description = 'Utilisateur'
 
-    actions = ["export_as_csv"]
+    export_columns = PARTICIPANT_COLUMNS + tuple(model_columns(
+        Participation,
+        user=('user__email', 'user'),
+        visit=('visit__title', 'visit'),
+    ))
 
     def school(self, participation: Participation):
-        """Return a link to the participation's user's school."""
-        school = Student.objects.get(user=participation.user).school
-        return school
+        """Return the participation's user's school."""
+        return _get_school(participation)
     school.short_description = "Établissement"
 
-    def export_as_csv(self, request, queryset):
-        meta = self.model._meta
-        field_names = [field.name for field in meta.fields]
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename={}.csv'.format(
-            meta)
-        response.write(codecs.BOM_UTF8)  # force response to be UTF-8
-        writer = csv.writer(response, delimiter=';')
-
-        writer.writerow(['first_name', 'last_name', 'school', 'grade',
-                         'phone_number', 'scholarship'] + field_names)
-
-        list_email = queryset.values_list("user__email", flat=True)
-        nb_user = 0
-        for obj in queryset:
-
-            name = User.objects.filter(
-                email=str(list_email[nb_user])).values('first_name', 'last_name', 'phone_number')
-            school = Student.objects.filter(
-                user__email=str(list_email[nb_user])).values('school', 'grade', 'scholarship')
-
-            row = writer.writerow([name[0]['first_name'], name[0]['last_name'], school[0]['school'], school[0]['grade'], name[0]['phone_number'], school[0]['scholarship']] + [getattr(obj, field)
-                                                                                                                                                                               for field in field_names])
-
-            nb_user += 1
-        return response
-
-    export_as_csv.short_description = "Exporter sélection (en .csv)"
-
 
 @ admin.register(Visit.organizers.through)
 class VisitOrganizersAdmin(admin.ModelAdmin):
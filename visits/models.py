@@ -1,5 +1,7 @@
 """Visits models."""
-from django.db import models
+from typing import List
+
+from django.db import models, transaction
 from django.contrib.sites.models import Site
 from django.shortcuts import reverse
 from django.utils.timezone import now
@@ -7,6 +9,8 @@ from dry_rest_permissions.generics import authenticated_users
 
 from markdownx.models import MarkdownxField
 
+from core.models import MarkdownHTMLMixin
+
 
 class VisitQuerySet(models.QuerySet):
     """Custom Visit queryset."""
@@ -36,6 +40,46 @@ class VisitQuerySet(models.QuerySet):
         return self.filter(date__gt=now().date())
 
 
+class ParticipationQuerySet(models.QuerySet):
+    """Custom Participation queryset."""
+
+    def set_accepted(self, accepted: int) -> List['Participation']:
+        """Change the status of participations in bulk.
+
+        The status is updated with a single UPDATE query, then the
+        `accepted_changed` signal is sent for each participation whose
+        status changed, as saving them one by one would. Notifications
+        sent by the receivers are delivered in a batch.
+
+        Returns
+        -------
+        changed : list of Participation
+            The participations whose status changed.
+        """
+        # Imported here to avoid circular imports
+        from mails import batch
+        from .signals import accepted_changed
+
+        with transaction.atomic():
+            changed = list(
+                self.exclude(accepted=accepted)
+                .select_related('user', 'visit')
+                .select_for_update(of=('self',))
+            )
+            Participation.objects.filter(
+                pk__in=[participation.pk for participation in changed]
+            ).update(accepted=accepted)
+
+        with batch():
+            for participation in changed:
+                participation.accepted = accepted
+                accepted_changed.send(sender=Participation,
+                                      instance=participation)
+                participation.initial_accepted = accepted
+
+        return changed
+
+
 class Participation(models.Model):
     """Represents the participation of a user to a visit.
 
@@ -69,6 +113,8 @@ class Participation(models.Model):
             "Une fois la sortie passée, indiquer si le lycéen était présent."
         ))
 
+    objects = ParticipationQuerySet.as_manager()
+
     class Meta:  # noqa
         verbose_name = 'participation'
         # prevent a user from participating visit multiple times
@@ -123,7 +169,7 @@ class VisitOrganizer(models.Model):
         return str(self.tutor)
 
 
-class Visit(models.Model):
+class Visit(MarkdownHTMLMixin, models.Model):
     """Represents a visit that users can attend."""
 
     objects = VisitQuerySet.as_manager()
@@ -143,6 +189,10 @@ class Visit(models.Model):
         blank=True, default='',
         help_text=('Une description plus complète des activités proposées '
                    'durant la sortie. Ce champ supporte Markdown.'))
+    description_html = models.TextField(
+        editable=False, blank=True, default='')
+    description_hash = models.CharField(
+        max_length=40, editable=False, blank=True, default='')
     place = models.ForeignKey(
         'Place',
         verbose_name='lieu',
@@ -192,6 +242,8 @@ class Visit(models.Model):
                                         through='VisitOrganizer',
                                         related_name='organized_visits')
 
+    markdown_fields = ('description',)
+
     def _registrations_open(self):
         return now() < self.deadline
     # display fancy icon in admin instead of True/False
@@ -234,7 +286,7 @@ class Visit(models.Model):
         return str(self.title)
 
 
-class Place(models.Model):
+class Place(MarkdownHTMLMixin, models.Model):
     """Represents a place a visit happens at."""
 
     name = models.CharField('nom', max_length=200)
@@ -251,6 +303,13 @@ class Place(models.Model):
         )
     )
 
+    description_html = models.TextField(
+        editable=False, blank=True, default='')
+    description_hash = models.CharField(
+        max_length=40, editable=False, blank=True, default='')
+
+    markdown_fields = ('description',)
+
     class Meta:  # noqa
         verbose_name = 'lieu'
         verbose_name_plural = 'lieux'
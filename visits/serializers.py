@@ -59,7 +59,8 @@ class VisitListSerializer(serializers.HyperlinkedModelSerializer):
     organizers = serializers.SerializerMethodField()
 
     def get_organizers(self, obj):
-        return obj.organizers.values_list('user__id', flat=True)
+        # Read from prefetched organizers if available
+        return [tutor.user_id for tutor in obj.organizers.all()]
 
     passed = serializers.SerializerMethodField()
 
@@ -84,6 +85,7 @@ class VisitListSerializer(serializers.HyperlinkedModelSerializer):
 class VisitSerializer(VisitListSerializer):
     """Serializer for Visit."""
 
+    description = MarkdownField()
     place = PlaceSerializer()
     organizers = VisitOrganizerSerializer(many=True)
 
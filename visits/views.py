@@ -1,11 +1,14 @@
 """Visits API views."""
 
-
+from django.db.models import Prefetch
 from dry_rest_permissions.generics import DRYPermissions
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from core.conditional import ConditionalGetMixin
+from core.models import Address
+
 from .models import Participation, Place, Visit
 from .serializers import (ParticipationCancelledSerializer,
                           ParticipationSerializer, PlaceSerializer,
@@ -121,6 +124,17 @@ class VisitViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Visit.objects.all()
     permission_classes = [DRYPermissions]
 
+    def get_queryset(self):
+        participations = Participation.objects.select_related('user')
+        return (
+            super().get_queryset()
+            .select_related('place__address')
+            .prefetch_related(
+                Prefetch('participations', queryset=participations),
+                'organizers__user',
+            )
+        )
+
     def get_serializer_class(self):
         if self.action == 'list':
             return VisitListSerializer
@@ -212,8 +226,9 @@ class ParticipationsViewSet(mixins.CreateModelMixin,
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class PlaceViewSet(viewsets.ReadOnlyModelViewSet):
+class PlaceViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """Simple read-only view set for places."""
 
     queryset = Place.objects.all()
     serializer_class = PlaceSerializer
+    version_models = (Place, Address)